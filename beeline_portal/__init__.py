@@ -1 +1,12 @@
 from .client import BeelinePBX
+
+__all__ = ['BeelinePBX', 'AsyncBeelinePBX']
+
+
+def __getattr__(name: str):
+    # the async client imports aiohttp, sync-only users don't pay for it
+    if name == 'AsyncBeelinePBX':
+        from .async_client import AsyncBeelinePBX
+
+        return AsyncBeelinePBX
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,989 @@
+from base64 import b64encode
+from typing import (
+    Optional,
+    Dict,
+    Union,
+    List,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    BinaryIO,
+    Tuple,
+)
+from datetime import datetime
+from asyncio import (
+    CancelledError,
+    Semaphore,
+    TimeoutError,
+    ensure_future,
+    gather,
+    sleep,
+)
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None  # type: ignore
+
+from .errors import BeelinePBXException
+from .base import BaseBeelinePBX
+from .utils import Endpoint
+from .metrics import RequestObserver
+from .singleflight import AsyncSingleFlight
+from .jsonstream import JsonArrayParser
+from .codecs import JsonCodec
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter, release_on_close
+from .models import (
+    Abonent,
+    BwlStatusResponse,
+    BwlRule,
+    Number,
+    StatRecordV2,
+    StatRecord,
+    CfbResponse,
+    Cfb,
+    CfsStatusResponse,
+    CfsRule,
+    CallRecord,
+    SubscriptionRequest,
+    Subscription,
+    IcrNumbersResult,
+    IcrRouteRule,
+    IcrRouteResult,
+    VoiceCampaign,
+    VoiceCampaignMessage,
+    VoiceCampaignQuestion,
+    VoiceCampaignInfoReport,
+    VoiceCampaignInfoNumber,
+)
+from .batch import StatRecordBatch
+from .recording import CHANGED, UNCHANGED, RecordingChange, recording_status
+from .lazy import LazyVoiceCampaignInfoReport
+
+
+class AsyncBeelinePBX(BaseBeelinePBX):
+    """asyncio variant of BeelinePBX.
+
+    All requests share one aiohttp session, so its connection pool
+    (``pool_size`` connections) is reused by every in-flight call.
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        pool_size: int = 100,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Union[float, Tuple[float, float], None] = (10, 60),
+        rate_limiter: Optional[RateLimiter] = None,
+        json_codec: Union[JsonCodec, str, None] = None,
+        observers: Optional[List[RequestObserver]] = None,
+        coalesce_requests: bool = False,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                'aiohttp is required for AsyncBeelinePBX, '
+                'install it with `pip install beeline-portal[async]`'
+            )
+        super().__init__(
+            access_token,
+            pool_size,
+            retry_policy,
+            timeout,
+            rate_limiter,
+            json_codec,
+            observers,
+            AsyncSingleFlight() if coalesce_requests else None,
+        )
+        self._session: Optional['aiohttp.ClientSession'] = None
+
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        if self._session is None or self._session.closed:
+            self._session = self._init_session()
+        return self._session
+
+    def _init_session(self) -> 'aiohttp.ClientSession':
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+        else:
+            connect = read = self.timeout
+        return aiohttp.ClientSession(
+            headers={'X-MPBX-API-AUTH-TOKEN': self.access_token},
+            connector=aiohttp.TCPConnector(limit=self.pool_size),
+            timeout=aiohttp.ClientTimeout(
+                total=None, sock_connect=connect, sock_read=read
+            ),
+        )
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self) -> 'AsyncBeelinePBX':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _request(
+        self,
+        http_method: str,
+        endpoint: str,
+        params: Optional[dict] = None,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> 'aiohttp.ClientResponse':
+        url = self._generate_request_url(endpoint, params)
+        template, started = self._start_request(http_method, endpoint)
+        attempt = 0
+        r = None
+        try:
+            while True:
+                attempt += 1
+                r = None
+                try:
+                    r = await self._send(http_method, url, **kwargs)
+                except (aiohttp.ClientConnectionError, TimeoutError):
+                    delay = self.retry_policy.retry_delay(
+                        attempt, http_method, idempotent=idempotent
+                    )
+                    if delay is None:
+                        raise self._connection_error()
+                    await sleep(delay)
+                    continue
+                except aiohttp.ClientError:
+                    # e.g. InvalidURL or a malformed response
+                    raise self._connection_error()
+                delay = self.retry_policy.retry_delay(
+                    attempt,
+                    http_method,
+                    r.status,
+                    r.headers.get('Retry-After'),
+                    idempotent,
+                )
+                if delay is None:
+                    return r
+                r.release()
+                await sleep(delay)
+        finally:
+            self._end_request(
+                template,
+                http_method,
+                r.status if r is not None else None,
+                len(kwargs.get('data') or b''),
+                (r.content_length or 0) if r is not None else 0,
+                started,
+                attempt,
+            )
+
+    async def _send(
+        self, http_method: str, url: str, **kwargs
+    ) -> 'aiohttp.ClientResponse':
+        if self.rate_limiter is None:
+            return await self.session.request(http_method, url, **kwargs)
+        release = await self.rate_limiter.async_acquire()
+        try:
+            r = await self.session.request(http_method, url, **kwargs)
+        except BaseException:
+            release()
+            raise
+        # the body is read after the headers, the slot is kept until release
+        release_on_close(r, release, 'release', 'close')
+        return r
+
+    async def _send_api_request(
+        self,
+        http_method: str,
+        endpoint: str,
+        params: Optional[dict] = None,
+        data: Union[Optional[dict], Optional[list], Optional[str]] = None,
+        file_: bool = False,
+        audio_file: bool = False,
+        idempotent: Optional[bool] = None,
+    ) -> Any:
+        key = self._coalesce_key(http_method, endpoint, params, data, file_)
+        if self.single_flight is not None and key is not None:
+            return await self.single_flight.do(
+                key,
+                lambda: self._perform_api_request(
+                    http_method, endpoint, params, data, file_, audio_file, idempotent
+                ),
+            )
+        return await self._perform_api_request(
+            http_method, endpoint, params, data, file_, audio_file, idempotent
+        )
+
+    async def _perform_api_request(
+        self,
+        http_method: str,
+        endpoint: str,
+        params: Optional[dict] = None,
+        data: Union[Optional[dict], Optional[list], Optional[str]] = None,
+        file_: bool = False,
+        audio_file: bool = False,
+        idempotent: Optional[bool] = None,
+    ) -> Any:
+        kwargs: dict = {}
+        if audio_file:
+            kwargs['data'] = data
+        elif data is not None:
+            kwargs['data'] = self.json_codec.dumps(data)
+            kwargs['headers'] = {'Content-Type': 'application/json'}
+        r = await self._request(http_method, endpoint, params, idempotent, **kwargs)
+        try:
+            body = await r.read()
+        except (aiohttp.ClientError, TimeoutError):
+            raise self._connection_error()
+        finally:
+            r.release()
+        if file_:
+            response = body
+        else:
+            try:
+                response = self.json_codec.loads(body)
+            except ValueError:
+                return await r.text()
+        if r.status > 204:
+            raise BeelinePBXException(response)
+        return response
+
+    async def _iter_json_array(
+        self,
+        endpoint: str,
+        params: Optional[dict] = None,
+        key: Optional[str] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator:
+        r = await self._request('get', endpoint, params)
+        try:
+            if r.status > 204:
+                body = await r.read()
+                raise BeelinePBXException(self._error_response(r.status, body))
+            parser = JsonArrayParser(key)
+            async for chunk in r.content.iter_chunked(chunk_size):
+                for item in parser.feed(chunk):
+                    yield self.json_codec.loads(item)
+                if parser.done:
+                    break
+        except (aiohttp.ClientError, TimeoutError):
+            raise self._connection_error()
+        finally:
+            r.release()
+
+    async def _open_download(
+        self, endpoint: str, offset: int
+    ) -> 'aiohttp.ClientResponse':
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+        r = await self._request('get', endpoint, headers=headers)
+        if r.status > 206:
+            body = await r.read()
+            r.release()
+            if offset:
+                # e.g. 416 for a stale partial file, start from scratch
+                return await self._open_download(endpoint, 0)
+            raise BeelinePBXException(self._error_response(r.status, body))
+        if r.status == 206 and not r.headers.get('Content-Range', '').startswith(
+            f'bytes {offset}-'
+        ):
+            r.release()
+            return await self._open_download(endpoint, 0)
+        return r
+
+    async def _download_to(
+        self,
+        endpoint: str,
+        dest: Union[str, BinaryIO],
+        chunk_size: int,
+        resume: bool = False,
+        expected_size: Optional[int] = None,
+    ) -> int:
+        offset = self._download_offset(dest, resume, expected_size)
+        if offset is None:
+            return 0
+        written = 0
+        try:
+            r = await self._open_download(endpoint, offset)
+            try:
+                if r.status != 206:
+                    offset = 0
+                mode = 'ab' if offset else 'wb'
+                f = open(dest, mode) if isinstance(dest, str) else dest
+                try:
+                    async for chunk in r.content.iter_chunked(chunk_size):
+                        f.write(chunk)
+                        written += len(chunk)
+                finally:
+                    if isinstance(dest, str):
+                        f.close()
+            finally:
+                r.release()
+        except (aiohttp.ClientError, TimeoutError):
+            raise self._connection_error()
+        self._check_download_size(offset + written, expected_size)
+        return written
+
+    async def _fan_out(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        args: Dict[str, tuple],
+        max_workers: int,
+    ) -> Dict[str, Any]:
+        semaphore = Semaphore(max_workers)
+
+        async def call(key: str) -> Any:
+            async with semaphore:
+                try:
+                    return await fn(*args[key])
+                except BeelinePBXException as e:
+                    return e
+                except CancelledError:
+                    raise
+                except Exception as e:
+                    # fails this key only, the other results are kept
+                    return self._unexpected_error(e)
+
+        results = await gather(*(call(key) for key in args))
+        return dict(zip(args, results))
+
+    async def get_abonents(self) -> map:
+        response = await self._send_api_request('get', 'abonents')
+        return map(Abonent.from_beeline_struct, response)
+
+    async def find_abonent(self, pattern: str) -> Abonent:
+        response = await self._send_api_request(
+            'get', Endpoint('abonents/{pattern}', pattern=pattern)
+        )
+        return Abonent.from_beeline_struct(response)
+
+    async def get_abonent_agent_status(self, pattern: str) -> dict:
+        status = await self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/agent', pattern=pattern)
+        )
+        return {'status': status}
+
+    async def set_abonent_agent_status(self, pattern: str, status: str) -> dict:
+        _ = await self._send_api_request(
+            'put',
+            Endpoint('abonents/{pattern}/agent', pattern=pattern),
+            data={'status': status},
+        )
+        return {}
+
+    async def get_agent_statuses(
+        self, patterns: List[str], max_workers: Optional[int] = None
+    ) -> Dict[str, Union[dict, BeelinePBXException]]:
+        return await self._fan_out(
+            self.get_abonent_agent_status,
+            {pattern: (pattern,) for pattern in patterns},
+            max_workers or self.pool_size,
+        )
+
+    async def set_agent_statuses(
+        self, statuses: Dict[str, str], max_workers: Optional[int] = None
+    ) -> Dict[str, Union[dict, BeelinePBXException]]:
+        return await self._fan_out(
+            self.set_abonent_agent_status,
+            {pattern: (pattern, status) for pattern, status in statuses.items()},
+            max_workers or self.pool_size,
+        )
+
+    async def get_abonent_recording_status(self, pattern: str) -> dict:
+        status = await self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/recording', pattern=pattern)
+        )
+        return {'status': status}
+
+    async def enable_abonent_recording(self, pattern: str) -> dict:
+        _ = await self._send_api_request(
+            'put', Endpoint('abonents/{pattern}/recording', pattern=pattern)
+        )
+        return {}
+
+    async def stop_abonent_recording(self, pattern: str) -> dict:
+        _ = await self._send_api_request(
+            'delete', Endpoint('abonents/{pattern}/recording', pattern=pattern)
+        )
+        return {}
+
+    async def _set_abonent_recording(
+        self, pattern: str, enable: bool
+    ) -> RecordingChange:
+        previous_status = (await self.get_abonent_recording_status(pattern))['status']
+        if previous_status == recording_status(enable):
+            return RecordingChange(pattern, previous_status, UNCHANGED)
+        if enable:
+            await self.enable_abonent_recording(pattern)
+        else:
+            await self.stop_abonent_recording(pattern)
+        return RecordingChange(pattern, previous_status, CHANGED)
+
+    async def set_abonents_recording(
+        self,
+        enable: bool,
+        patterns: Optional[List[str]] = None,
+        department: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Union[RecordingChange, BeelinePBXException]]:
+        patterns = list(patterns or [])
+        if department is not None:
+            patterns += [
+                a.user_id
+                for a in await self.get_abonents()
+                if a.department == department
+            ]
+        return await self._fan_out(
+            self._set_abonent_recording,
+            {pattern: (pattern, enable) for pattern in patterns},
+            max_workers or self.pool_size,
+        )
+
+    async def enable_abonents_recording(
+        self,
+        patterns: Optional[List[str]] = None,
+        department: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Union[RecordingChange, BeelinePBXException]]:
+        return await self.set_abonents_recording(
+            True, patterns, department, max_workers
+        )
+
+    async def stop_abonents_recording(
+        self,
+        patterns: Optional[List[str]] = None,
+        department: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Union[RecordingChange, BeelinePBXException]]:
+        return await self.set_abonents_recording(
+            False, patterns, department, max_workers
+        )
+
+    async def call_from_abonent(self, pattern: str, phone_number: str) -> dict:
+        response = await self._send_api_request(
+            'post',
+            Endpoint('abonents/{pattern}/call', pattern=pattern),
+            {'phoneNumber': phone_number},
+        )
+        return {'response': response}
+
+    async def call_from_abonent_v2(self, pattern: str, phone_number: str) -> dict:
+        response = await self._send_api_request(
+            'post',
+            Endpoint('v2/abonents/{pattern}/call', pattern=pattern),
+            {'phoneNumber': phone_number},
+        )
+        return {'response': response}
+
+    async def transfer_call_from_abonent(
+        self, pattern: str, call_id: str, phone_number: str
+    ) -> dict:
+        _ = await self._send_api_request(
+            'post',
+            Endpoint('abonents/{pattern}/callTransfer', pattern=pattern),
+            {'callId': call_id, 'phoneNumber': phone_number},
+        )
+        return {}
+
+    async def transfer_call_with_consult(
+        self, pattern: str, call_id: str, call_id_consult: str
+    ) -> dict:
+        _ = await self._send_api_request(
+            'post',
+            Endpoint('abonents/{pattern}/callTransferConsult', pattern=pattern),
+            {'callId': call_id, 'callIdConsult': call_id_consult},
+        )
+        return {}
+
+    async def add_extension_number(
+        self, pattern: str, phone_number: str, schedule: str
+    ) -> dict:
+        _ = await self._send_api_request(
+            'put',
+            Endpoint('abonents/{pattern}/number', pattern=pattern),
+            {'phoneNumber': phone_number, 'schedule': schedule},
+        )
+        return {}
+
+    async def delete_extension_number(self, pattern: str) -> dict:
+        _ = await self._send_api_request(
+            'delete',
+            Endpoint('abonents/{pattern}/number', pattern=pattern),
+        )
+        return {}
+
+    async def get_cfb(self, pattern: str) -> CfbResponse:
+        response = await self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/cfb', pattern=pattern)
+        )
+        return CfbResponse.from_beeline_struct(response)
+
+    async def enable_cfb(self, pattern: str, cfb: Cfb) -> dict:
+        _ = await self._send_api_request(
+            'put',
+            Endpoint('abonents/{pattern}/cfb', pattern=pattern),
+            data=cfb.to_beeline_struct(),
+        )
+        return {}
+
+    async def stop_cfb(self, pattern: str) -> dict:
+        _ = await self._send_api_request(
+            'delete',
+            Endpoint('abonents/{pattern}/cfb', pattern=pattern),
+        )
+        return {}
+
+    async def get_cfs_rules(self, pattern: str) -> CfsStatusResponse:
+        response = await self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/cfs', pattern=pattern)
+        )
+        return CfsStatusResponse.from_beeline_struct(response)
+
+    async def add_cfs_rule(self, pattern: str, cfs_rule: CfsRule) -> dict:
+        response = await self._send_api_request(
+            'post',
+            Endpoint('abonents/{pattern}/cfs', pattern=pattern),
+            data=cfs_rule.to_beeline_struct(),
+        )
+        return {'number': response}
+
+    async def enable_cfs(self, pattern: str) -> dict:
+        _ = await self._send_api_request(
+            'put', Endpoint('abonents/{pattern}/cfs', pattern=pattern)
+        )
+        return {}
+
+    async def update_cfs_rule(
+        self, pattern: str, cfs_id: str, cfs_rule: CfsRule
+    ) -> dict:
+        _ = await self._send_api_request(
+            'put',
+            Endpoint('abonents/{pattern}/cfs/{cfs_id}', pattern=pattern, cfs_id=cfs_id),
+            data=cfs_rule.to_beeline_struct(),
+        )
+        return {}
+
+    async def stop_cfs(self, pattern: str) -> dict:
+        _ = await self._send_api_request(
+            'delete', Endpoint('abonents/{pattern}/cfs', pattern=pattern)
+        )
+        return {}
+
+    async def delete_cfs_rule(self, pattern: str, cfs_id: str) -> dict:
+        _ = await self._send_api_request(
+            'delete',
+            Endpoint('abonents/{pattern}/cfs/{cfs_id}', pattern=pattern, cfs_id=cfs_id),
+        )
+        return {}
+
+    async def get_bwl_list(self, pattern: str) -> BwlStatusResponse:
+        response = await self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/bwl', pattern=pattern)
+        )
+        return BwlStatusResponse.from_beeline_struct(response)
+
+    async def add_bwl_rule(self, pattern: str, type_: str, bwl_rule: BwlRule) -> dict:
+        response = await self._send_api_request(
+            'post',
+            Endpoint('abonents/{pattern}/bwl', pattern=pattern),
+            data={'type': type_, 'rule': bwl_rule.to_beeline_struct()},
+        )
+        return {'number': response}
+
+    async def update_bwl_rule(
+        self, pattern: str, bwl_id: str, bwl_rule: BwlRule
+    ) -> dict:
+        _ = await self._send_api_request(
+            'post',
+            Endpoint('abonents/{pattern}/bwl/{bwl_id}', pattern=pattern, bwl_id=bwl_id),
+            data=bwl_rule.to_beeline_struct(),
+        )
+        return {}
+
+    async def enable_bwl(self, pattern: str, rule_type: str) -> dict:
+        _ = await self._send_api_request(
+            'put',
+            Endpoint('abonents/{pattern}/bwl', pattern=pattern),
+            {'ruleType': rule_type},
+        )
+        return {}
+
+    async def stop_bwl(self, pattern: str) -> dict:
+        _ = await self._send_api_request(
+            'delete', Endpoint('abonents/{pattern}/bwl', pattern=pattern)
+        )
+        return {}
+
+    async def delete_bwl_rule(self, pattern: str, bwl_id: str) -> dict:
+        _ = await self._send_api_request(
+            'delete',
+            Endpoint('abonents/{pattern}/bwl/{bwl_id}', pattern=pattern, bwl_id=bwl_id),
+        )
+        return {}
+
+    async def get_records(
+        self,
+        params: Optional[dict] = None,
+        compact: bool = False,
+        lazy: bool = False,
+    ) -> map:
+        response = await self._send_api_request('get', 'records', params=params)
+        model = self._call_record_model(compact, lazy)
+        return map(model.from_beeline_struct, response)
+
+    async def delete_record(self, record_id: str) -> dict:
+        _ = await self._send_api_request(
+            'delete', Endpoint('v2/records/{record_id}', record_id=record_id)
+        )
+        return {}
+
+    async def iter_records(
+        self,
+        params: Optional[dict] = None,
+        compact: bool = False,
+        lazy: bool = False,
+        chunk_size: int = 64 * 1024,
+    ) -> AsyncIterator[CallRecord]:
+        model = self._call_record_model(compact, lazy)
+        async for item in self._iter_json_array(
+            'records', params, chunk_size=chunk_size
+        ):
+            yield model.from_beeline_struct(item)
+
+    async def get_record(self, record_id: str) -> CallRecord:
+        response = await self._send_api_request(
+            'get', Endpoint('v2/records/{record_id}', record_id=record_id)
+        )
+        return CallRecord.from_beeline_struct(response)
+
+    async def get_record_by_external_id(
+        self, external_id: str, user_id: str
+    ) -> CallRecord:
+        response = await self._send_api_request(
+            'get',
+            Endpoint(
+                'v2/records/{external_id}/{user_id}',
+                external_id=external_id,
+                user_id=user_id,
+            ),
+        )
+        return CallRecord.from_beeline_struct(response)
+
+    async def download_record(self, record_id: str) -> bytes:
+        response = await self._send_api_request(
+            'get',
+            Endpoint('v2/records/{record_id}/download', record_id=record_id),
+            file_=True,
+        )
+        return response
+
+    async def download_record_by_external_id(
+        self, external_id: str, user_id: str
+    ) -> bytes:
+        response = await self._send_api_request(
+            'get',
+            Endpoint(
+                'v2/records/{external_id}/{user_id}/download',
+                external_id=external_id,
+                user_id=user_id,
+            ),
+            file_=True,
+        )
+        return response
+
+    async def download_record_to(
+        self,
+        record_id: str,
+        dest: Union[str, BinaryIO],
+        chunk_size: int = 64 * 1024,
+        resume: bool = False,
+        expected_size: Optional[int] = None,
+    ) -> int:
+        return await self._download_to(
+            Endpoint('v2/records/{record_id}/download', record_id=record_id),
+            dest,
+            chunk_size,
+            resume,
+            expected_size,
+        )
+
+    async def download_record_by_external_id_to(
+        self,
+        external_id: str,
+        user_id: str,
+        dest: Union[str, BinaryIO],
+        chunk_size: int = 64 * 1024,
+        resume: bool = False,
+        expected_size: Optional[int] = None,
+    ) -> int:
+        return await self._download_to(
+            Endpoint(
+                'v2/records/{external_id}/{user_id}/download',
+                external_id=external_id,
+                user_id=user_id,
+            ),
+            dest,
+            chunk_size,
+            resume,
+            expected_size,
+        )
+
+    async def get_record_link(self, record_id: str) -> str:
+        response = await self._send_api_request(
+            'get', Endpoint('records/{record_id}/reference', record_id=record_id)
+        )
+        return response
+
+    async def get_record_link_by_external_id(
+        self, external_id: str, user_id: str
+    ) -> str:
+        response = await self._send_api_request(
+            'get',
+            Endpoint(
+                'records/{external_id}/{user_id}/reference',
+                external_id=external_id,
+                user_id=user_id,
+            ),
+        )
+        return response
+
+    async def get_incoming_numbers(self) -> map:
+        response = await self._send_api_request('get', 'numbers')
+        return map(Number.from_beeline_struct, response)
+
+    async def find_incoming_number(self, pattern: str) -> Number:
+        response = await self._send_api_request(
+            'get', Endpoint('numbers/{pattern}', pattern=pattern)
+        )
+        return Number.from_beeline_struct(response)
+
+    async def create_subscription(self, subscription: SubscriptionRequest) -> dict:
+        # every call creates a new subscription, a retry would duplicate it
+        response = await self._send_api_request(
+            'put',
+            'subscription',
+            data=subscription.to_beeline_struct(),
+            idempotent=False,
+        )
+        return response
+
+    async def get_subscription(self, subscription_id: str) -> Subscription:
+        response = await self._send_api_request(
+            'get', 'subscription', params={'subscriptionId': subscription_id}
+        )
+        return Subscription.from_beeline_struct(response)
+
+    async def stop_subscrption(self, subscription_id: str) -> dict:
+        _ = await self._send_api_request(
+            'delete', 'subscription', params={'subscriptionId': subscription_id}
+        )
+        return {}
+
+    async def get_icr_numbers(self) -> map:
+        response = await self._send_api_request('get', 'icr/numbers')
+        return map(Number.from_beeline_struct, response)
+
+    async def enable_icr_for_number(self, numbers: list) -> map:
+        response = await self._send_api_request('put', 'icr/numbers', data=numbers)
+        return map(IcrNumbersResult.from_beeline_struct, response)
+
+    async def stop_icr_for_number(self, numbers: list) -> map:
+        response = await self._send_api_request('delete', 'icr/numbers', data=numbers)
+        return map(IcrNumbersResult.from_beeline_struct, response)
+
+    async def get_icr_route_rules(self) -> map:
+        response = await self._send_api_request('get', '/icr/route')
+        return map(IcrRouteRule.from_beeline_struct, response)
+
+    async def _list_icr_rules_operation(
+        self, operation: str, icr_rules: List[IcrRouteRule]
+    ) -> map:
+        response = await self._send_api_request(
+            operation,
+            '/icr/route',
+            data=[rule.to_beeline_struct() for rule in icr_rules],
+        )
+        return map(IcrRouteResult.from_beeline_struct, response)
+
+    async def delete_list_of_icr_rules(self, icr_rules: List[IcrRouteRule]) -> map:
+        return await self._list_icr_rules_operation('delete', icr_rules)
+
+    async def add_list_of_icr_rules(self, icr_rules: List[IcrRouteRule]) -> map:
+        return await self._list_icr_rules_operation('post', icr_rules)
+
+    async def update_list_of_icr_rules(self, icr_rules: List[IcrRouteRule]) -> map:
+        return await self._list_icr_rules_operation('put', icr_rules)
+
+    async def get_voice_campaigns(self) -> map:
+        response = await self._send_api_request('get', 'vc')
+        return map(VoiceCampaign.from_beeline_struct, response)
+
+    async def upload_file_to_voice_campaign(self, path_to_file: str) -> dict:
+        with open(path_to_file, 'rb') as f:
+            b64_str = b64encode(f.read()).decode()
+        response: dict = await self._send_api_request(
+            'post', 'vc/upload', data=b64_str, audio_file=True
+        )
+        return {'id': response['id']}
+
+    async def add_question_type_voice_campaign(
+        self, campaign: VoiceCampaignQuestion
+    ) -> str:
+        response = await self._send_api_request(
+            'post', 'vc/question', data=campaign.to_beeline_struct()
+        )
+        return response
+
+    async def add_message_type_voice_campaign(
+        self, campaign: VoiceCampaignMessage
+    ) -> str:
+        response = await self._send_api_request(
+            'post', 'vc/message', data=campaign.to_beeline_struct()
+        )
+        return response
+
+    async def update_voice_campaign(
+        self, campaign_id: str, campaign: VoiceCampaign
+    ) -> dict:
+        _ = await self._send_api_request(
+            'put',
+            Endpoint('vc/{campaign_id}', campaign_id=campaign_id),
+            data=campaign.to_beeline_struct(),
+        )
+        return {}
+
+    async def delete_voice_campaign(self, campaign_id: str) -> dict:
+        _ = await self._send_api_request(
+            'delete',
+            Endpoint('vc/{campaign_id}', campaign_id=campaign_id),
+        )
+        return {}
+
+    async def stop_voice_campaign(self, campaign_id: str) -> dict:
+        _ = await self._send_api_request(
+            'put',
+            Endpoint('vc/stop/{campaign_id}', campaign_id=campaign_id),
+        )
+        return {}
+
+    async def start_voice_campaign(self, campaign_id: str) -> dict:
+        _ = await self._send_api_request(
+            'put',
+            Endpoint('vc/start/{campaign_id}', campaign_id=campaign_id),
+        )
+        return {}
+
+    async def get_voice_campaign_info(
+        self, campaign_id: str, lazy: bool = False
+    ) -> VoiceCampaignInfoReport:
+        response = await self._send_api_request(
+            'get',
+            Endpoint('vc/info/{campaign_id}', campaign_id=campaign_id),
+        )
+        if lazy:
+            return LazyVoiceCampaignInfoReport(response)  # type: ignore
+        return VoiceCampaignInfoReport.from_beeline_struct(response)
+
+    async def iter_voice_campaign_info_numbers(
+        self, campaign_id: str, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[VoiceCampaignInfoNumber]:
+        async for item in self._iter_json_array(
+            Endpoint('vc/info/{campaign_id}', campaign_id=campaign_id),
+            key='numberList',
+            chunk_size=chunk_size,
+        ):
+            yield VoiceCampaignInfoNumber.from_beeline_struct(item)
+
+    async def get_statistic(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page: int = 0,
+        page_size: int = 100,
+        compact: bool = False,
+    ) -> map:
+        params = self._statistic_params(user_id, date_from, date_to, page, page_size)
+        response = await self._send_api_request('get', 'statistics', params)
+        model = self._stat_record_model(compact)
+        return map(model.from_beeline_struct, response)
+
+    async def get_v2_statistic(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page: int = 0,
+        page_size: int = 100,
+        compact: bool = False,
+        lazy: bool = False,
+    ) -> map:
+        params = self._statistic_params(user_id, date_from, date_to, page, page_size)
+        response = await self._send_api_request('get', 'v2/statistics', params)
+        model = self._stat_record_v2_model(compact, lazy)
+        return map(model.from_beeline_struct, response)
+
+    async def get_v2_statistic_batch(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page: int = 0,
+        page_size: int = 100,
+    ) -> StatRecordBatch:
+        params = self._statistic_params(user_id, date_from, date_to, page, page_size)
+        response = await self._send_api_request('get', 'v2/statistics', params)
+        return StatRecordBatch.from_beeline_struct(response)
+
+    async def _iter_pages(
+        self, fetch_page: Callable[[int], Awaitable[map]], page_size: int
+    ) -> AsyncIterator:
+        async def fetch(page: int) -> list:
+            return list(await fetch_page(page))
+
+        page = 0
+        future = ensure_future(fetch(page))
+        try:
+            while future is not None:
+                records = await future
+                if len(records) < page_size:
+                    future = None
+                else:
+                    page += 1
+                    future = ensure_future(fetch(page))
+                for record in records:
+                    yield record
+        finally:
+            if future is not None:
+                future.cancel()
+
+    def iter_statistic(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page_size: int = 100,
+        compact: bool = False,
+    ) -> AsyncIterator[StatRecord]:
+        return self._iter_pages(
+            lambda page: self.get_statistic(
+                user_id, date_from, date_to, page, page_size, compact
+            ),
+            page_size,
+        )
+
+    def iter_v2_statistic(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page_size: int = 100,
+        compact: bool = False,
+        lazy: bool = False,
+    ) -> AsyncIterator[StatRecordV2]:
+        return self._iter_pages(
+            lambda page: self.get_v2_statistic(
+                user_id, date_from, date_to, page, page_size, compact, lazy
+            ),
+            page_size,
+        )
@@ -0,0 +1,175 @@
+"""Transport-independent parts of ``BeelinePBX`` and ``AsyncBeelinePBX``.
+
+``BaseBeelinePBX`` builds urls and query params, picks the record models,
+constructs errors and does the retry/observer bookkeeping of a request. The
+subclasses only send requests with their HTTP library.
+"""
+import os
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, List, Optional, Tuple, Type, Union
+from urllib.parse import urlencode
+
+from .errors import BeelinePBXException
+from .utils import endpoint_template
+from .metrics import RequestInfo, RequestObserver
+from .codecs import JsonCodec, get_json_codec
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter
+from .models import CallRecord, StatRecord, StatRecordV2
+from .compact import CompactCallRecord, CompactStatRecord, CompactStatRecordV2
+from .lazy import LazyCallRecord, LazyStatRecordV2
+
+
+class BaseBeelinePBX(object):
+    API_URL = 'https://cloudpbx.beeline.ru/apis/portal/'
+
+    def __init__(
+        self,
+        access_token: str,
+        pool_size: int,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Union[float, Tuple[float, float], None] = (10, 60),
+        rate_limiter: Optional[RateLimiter] = None,
+        json_codec: Union[JsonCodec, str, None] = None,
+        observers: Optional[List[RequestObserver]] = None,
+        single_flight: Any = None,
+    ):
+        self.access_token = access_token
+        self.pool_size = pool_size
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.observers = list(observers or [])
+        self.single_flight = single_flight
+        self.json_codec = (
+            json_codec
+            if isinstance(json_codec, JsonCodec)
+            else get_json_codec(json_codec)
+        )
+
+    def _generate_request_url(
+        self, endpoint: str, params: Optional[dict] = None
+    ) -> str:
+        url = f'{self.API_URL}{endpoint}'
+        if params:
+            url = f'{url}?{urlencode(params)}'
+        return url
+
+    @staticmethod
+    def _connection_error() -> BeelinePBXException:
+        return BeelinePBXException(
+            {'errorCode': 500, 'description': 'Connection Error or cant'}
+        )
+
+    @staticmethod
+    def _unexpected_error(error: Exception) -> BeelinePBXException:
+        exception = BeelinePBXException({'errorCode': 500, 'description': repr(error)})
+        exception.__cause__ = error
+        return exception
+
+    def _error_response(self, status: int, body: bytes) -> dict:
+        try:
+            return self.json_codec.loads(body)
+        except ValueError:
+            return {'errorCode': status, 'description': body.decode(errors='replace')}
+
+    @staticmethod
+    def _coalesce_key(
+        http_method: str,
+        endpoint: str,
+        params: Optional[dict],
+        data: Any,
+        file_: bool,
+    ) -> Optional[tuple]:
+        # only reads without a body are shared between concurrent callers
+        if http_method != 'get' or data is not None:
+            return None
+        return str(endpoint), repr(sorted((params or {}).items())), file_
+
+    def _start_request(self, http_method: str, endpoint: str) -> Tuple[str, float]:
+        template = endpoint_template(endpoint)
+        for observer in self.observers:
+            observer.on_request_start(http_method, template)
+        return template, time.perf_counter()
+
+    def _end_request(
+        self,
+        template: str,
+        http_method: str,
+        status_code: Optional[int],
+        sent: int,
+        received: int,
+        started: float,
+        attempts: int,
+    ) -> None:
+        if not self.observers:
+            return
+        info = RequestInfo(
+            template,
+            http_method,
+            status_code,
+            sent,
+            received,
+            time.perf_counter() - started,
+            attempts - 1,
+        )
+        for observer in self.observers:
+            observer.on_request_end(info)
+
+    @staticmethod
+    def _download_offset(
+        dest: Union[str, BinaryIO], resume: bool, expected_size: Optional[int]
+    ) -> Optional[int]:
+        """Where to resume a download, ``None`` if ``dest`` is already complete."""
+        offset = 0
+        if resume and isinstance(dest, str) and os.path.exists(dest):
+            offset = os.path.getsize(dest)
+            if expected_size is not None and offset > expected_size:
+                offset = 0
+        if expected_size is not None and offset and offset == expected_size:
+            return None
+        return offset
+
+    @staticmethod
+    def _check_download_size(size: int, expected_size: Optional[int]) -> None:
+        if expected_size is not None and size != expected_size:
+            raise BeelinePBXException(
+                {
+                    'errorCode': 500,
+                    'description': f'Downloaded {size} bytes, '
+                    f'expected {expected_size}',
+                }
+            )
+
+    @staticmethod
+    def _call_record_model(compact: bool, lazy: bool) -> Type[CallRecord]:
+        return LazyCallRecord if lazy else CompactCallRecord if compact else CallRecord
+
+    @staticmethod
+    def _stat_record_model(compact: bool) -> Type[StatRecord]:
+        return CompactStatRecord if compact else StatRecord
+
+    @staticmethod
+    def _stat_record_v2_model(compact: bool, lazy: bool) -> Type[StatRecordV2]:
+        return (
+            LazyStatRecordV2
+            if lazy
+            else CompactStatRecordV2 if compact else StatRecordV2
+        )
+
+    def _statistic_params(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page: int,
+        page_size: int,
+    ) -> dict:
+        return {
+            'userId': user_id,
+            'dateFrom': date_from.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'dateTo': date_to.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'page': page,
+            'pageSize': page_size,
+        }
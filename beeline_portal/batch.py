@@ -0,0 +1,322 @@
+import sys
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import Abonent, StatRecordV2
+from .utils import parse_datetime_from_milliseconds, to_milliseconds
+
+
+_UNSET = object()
+# imported by _numpy on first use, importing numpy is slow
+numpy: Any = _UNSET
+
+
+def _numpy() -> Any:
+    """Return the numpy module, or ``None`` if it is not installed."""
+    global numpy
+    if numpy is _UNSET:
+        try:
+            import numpy as module
+        except ImportError:  # pragma: no cover
+            module = None
+        numpy = module
+    return numpy
+
+
+class _Dictionary(object):
+    """Dictionary encoding of a low-cardinality string column."""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+        self.codes: Dict[Optional[str], int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+class StatRecordBatch(object):
+    """Column-oriented set of v2 statistic records.
+
+    ``start_date`` (epoch milliseconds) and ``duration`` are int64 arrays,
+    ``user_id``, ``direction`` and ``status`` are dictionary encoded into
+    integer code arrays and phones are interned string columns. Filters and
+    group-by sums work on the codes instead of building a ``StatRecordV2``
+    with a nested ``Abonent`` per row; with NumPy installed they run as
+    vectorized operations over the column buffers.
+    """
+
+    DICTIONARY_COLUMNS = ('user_id', 'direction', 'status')
+    STRING_COLUMNS = ('phone_from', 'phone_to', 'department', 'call_forward')
+
+    def __init__(self):
+        self.start_date = array('q')
+        self.duration = array('q')
+        self.codes: Dict[str, array] = {c: array('l') for c in self.DICTIONARY_COLUMNS}
+        self.dictionaries: Dict[str, _Dictionary] = {
+            c: _Dictionary() for c in self.DICTIONARY_COLUMNS
+        }
+        self.strings: Dict[str, List[Optional[str]]] = {
+            c: [] for c in self.STRING_COLUMNS
+        }
+        self.abonents: Dict[str, Abonent] = {}
+
+    def __len__(self) -> int:
+        return len(self.start_date)
+
+    @classmethod
+    def from_beeline_struct(cls, beeline_struct: Iterable[dict]) -> 'StatRecordBatch':
+        batch = cls()
+        batch.extend(beeline_struct)
+        return batch
+
+    def _append(
+        self,
+        start_date: int,
+        duration: int,
+        user_id: str,
+        direction: str,
+        status: str,
+        strings: Sequence[Optional[str]],
+    ) -> None:
+        self.start_date.append(start_date)
+        self.duration.append(duration)
+        self.codes['user_id'].append(self.dictionaries['user_id'].encode(user_id))
+        self.codes['direction'].append(self.dictionaries['direction'].encode(direction))
+        self.codes['status'].append(self.dictionaries['status'].encode(status))
+        for column, value in zip(self.STRING_COLUMNS, strings):
+            self.strings[column].append(_intern(value))
+
+    def extend(self, beeline_struct: Iterable[dict]) -> None:
+        """Decode a ``v2/statistics`` response page straight into the columns."""
+        for row in beeline_struct:
+            abonent = row['abonent']
+            user_id = abonent['userId']
+            if user_id not in self.abonents:
+                self.abonents[user_id] = Abonent.from_beeline_struct(abonent)
+            self._append(
+                row['startDate'],
+                row['duration'],
+                user_id,
+                row['direction'],
+                row['status'],
+                (
+                    row.get('phone_from'),
+                    row.get('phone_to'),
+                    row.get('department'),
+                    row.get('callForward'),
+                ),
+            )
+
+    def extend_batch(self, other: 'StatRecordBatch') -> None:
+        for i in range(len(other)):
+            user_id = other.value('user_id', i)
+            if user_id not in self.abonents:
+                self.abonents[user_id] = other.abonents[user_id]
+            self._append(
+                other.start_date[i],
+                other.duration[i],
+                user_id,
+                other.value('direction', i),
+                other.value('status', i),
+                [other.strings[c][i] for c in self.STRING_COLUMNS],
+            )
+
+    def value(self, column: str, i: int) -> Optional[str]:
+        if column in self.DICTIONARY_COLUMNS:
+            return self.dictionaries[column].values[self.codes[column][i]]
+        return self.strings[column][i]
+
+    def column(self, column: str) -> List[Optional[str]]:
+        if column in self.DICTIONARY_COLUMNS:
+            values = self.dictionaries[column].values
+            return [values[code] for code in self.codes[column]]
+        return list(self.strings[column])
+
+    def where(
+        self,
+        user_id: Optional[str] = None,
+        direction: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        min_duration: Optional[int] = None,
+    ) -> array:
+        """Return indexes of the rows matching every given condition."""
+        codes = []
+        for column, value in (
+            ('user_id', user_id),
+            ('direction', direction),
+            ('status', status),
+        ):
+            if value is None:
+                continue
+            code = self.dictionaries[column].codes.get(value)
+            if code is None:
+                return array('l')
+            codes.append((column, code))
+        date_from_ms = to_milliseconds(date_from) if date_from is not None else None
+        date_to_ms = to_milliseconds(date_to) if date_to is not None else None
+        if _numpy() is not None:
+            return self._where_numpy(codes, date_from_ms, date_to_ms, min_duration)
+
+        selected = range(len(self))
+        for column, code in codes:
+            column_codes = self.codes[column]
+            selected = [i for i in selected if column_codes[i] == code]
+        if date_from_ms is not None:
+            start = self.start_date
+            selected = [i for i in selected if start[i] >= date_from_ms]
+        if date_to_ms is not None:
+            start = self.start_date
+            selected = [i for i in selected if start[i] < date_to_ms]
+        if min_duration is not None:
+            duration = self.duration
+            selected = [i for i in selected if duration[i] >= min_duration]
+        return array('l', selected)
+
+    def _where_numpy(
+        self,
+        codes: List[Tuple[str, int]],
+        date_from_ms: Optional[int],
+        date_to_ms: Optional[int],
+        min_duration: Optional[int],
+    ) -> array:
+        columns = self.to_numpy()
+        mask = numpy.ones(len(self), dtype=bool)
+        for column, code in codes:
+            mask &= columns[column] == code
+        if date_from_ms is not None:
+            mask &= columns['start_date'] >= date_from_ms
+        if date_to_ms is not None:
+            mask &= columns['start_date'] < date_to_ms
+        if min_duration is not None:
+            mask &= columns['duration'] >= min_duration
+        selected = array('l')
+        selected.frombytes(numpy.flatnonzero(mask).astype(_dtype(selected)).tobytes())
+        return selected
+
+    def take(self, indexes: Iterable[int]) -> 'StatRecordBatch':
+        batch = StatRecordBatch()
+        for i in indexes:
+            user_id = self.value('user_id', i)
+            batch.abonents.setdefault(user_id, self.abonents[user_id])
+            batch._append(
+                self.start_date[i],
+                self.duration[i],
+                user_id,
+                self.value('direction', i),
+                self.value('status', i),
+                [self.strings[c][i] for c in self.STRING_COLUMNS],
+            )
+        return batch
+
+    def filter(self, **conditions) -> 'StatRecordBatch':
+        return self.take(self.where(**conditions))
+
+    def group_sum(
+        self, by: Sequence[str] = ('user_id',)
+    ) -> Dict[Tuple[Optional[str], ...], Tuple[int, int]]:
+        """Sum durations grouped by dictionary columns.
+
+        Returns ``{(value, ...): (calls, total_duration)}``.
+        """
+        for column in by:
+            if column not in self.DICTIONARY_COLUMNS:
+                raise ValueError(f'cannot group by {column}')
+        if _numpy() is not None:
+            return self._group_sum_numpy(by)
+        code_columns = [self.codes[column] for column in by]
+        counts: Dict[tuple, int] = defaultdict(int)
+        sums: Dict[tuple, int] = defaultdict(int)
+        for i, duration in enumerate(self.duration):
+            key = tuple(codes[i] for codes in code_columns)
+            counts[key] += 1
+            sums[key] += duration
+        dictionaries = [self.dictionaries[column].values for column in by]
+        return {
+            tuple(values[code] for values, code in zip(dictionaries, key)): (
+                counts[key],
+                sums[key],
+            )
+            for key in counts
+        }
+
+    def _group_sum_numpy(
+        self, by: Sequence[str]
+    ) -> Dict[Tuple[Optional[str], ...], Tuple[int, int]]:
+        columns = self.to_numpy()
+        dictionaries = [self.dictionaries[column].values for column in by]
+        # one combined code per row: the codes in the mixed radix of the
+        # dictionary sizes
+        key = numpy.zeros(len(self), dtype=numpy.int64)
+        for column, values in zip(by, dictionaries):
+            key = key * len(values) + columns[column]
+        groups = None
+        if numpy.prod([len(v) for v in dictionaries], dtype=float) > max(
+            len(self), 1 << 16
+        ):
+            # too many possible keys for a dense bincount, number the present ones
+            groups, key = numpy.unique(key, return_inverse=True)
+        counts = numpy.bincount(key)
+        sums = numpy.rint(numpy.bincount(key, weights=columns['duration']))
+        present = numpy.flatnonzero(counts)
+        keys = present if groups is None else groups[present]
+        result = {}
+        for key, calls, total in zip(
+            keys.tolist(), counts[present].tolist(), sums[present].tolist()
+        ):
+            group = []
+            for values in reversed(dictionaries):
+                key, code = divmod(key, len(values))
+                group.append(values[code])
+            result[tuple(reversed(group))] = (calls, int(total))
+        return result
+
+    def record(self, i: int) -> StatRecordV2:
+        return StatRecordV2(
+            parse_datetime_from_milliseconds(self.start_date[i]),
+            self.abonents[self.value('user_id', i)],
+            self.value('direction', i),
+            self.value('status', i),
+            self.duration[i],
+            self.strings['phone_to'][i],
+            self.strings['phone_from'][i],
+            self.strings['department'][i],
+            self.strings['call_forward'][i],
+        )
+
+    def to_records(self) -> List[StatRecordV2]:
+        return [self.record(i) for i in range(len(self))]
+
+    def to_numpy(self) -> dict:
+        """Return the numeric columns and dictionary codes as NumPy arrays.
+
+        The arrays share memory with the columns, nothing is copied; the
+        batch can not be extended while they are referenced.
+        """
+        if _numpy() is None:
+            raise ImportError('StatRecordBatch.to_numpy requires numpy')
+        columns = {
+            'start_date': numpy.frombuffer(self.start_date, dtype=numpy.int64),
+            'duration': numpy.frombuffer(self.duration, dtype=numpy.int64),
+        }
+        for column in self.DICTIONARY_COLUMNS:
+            codes = self.codes[column]
+            columns[column] = numpy.frombuffer(codes, dtype=_dtype(codes))
+        return columns
+
+
+def _dtype(values: array) -> str:
+    # 'l' is 4 bytes on Windows and 8 bytes elsewhere
+    return f'i{values.itemsize}'
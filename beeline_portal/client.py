@@ -1,11 +1,32 @@
+import time
 from base64 import b64encode
-from typing import Optional, Union, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import (
+    Optional,
+    Dict,
+    Union,
+    List,
+    Any,
+    Callable,
+    Iterator,
+    BinaryIO,
+    Tuple,
+)
 from datetime import datetime
-from urllib.parse import urlencode
-from json import JSONDecodeError
-from requests import Session, ConnectionError, ConnectTimeout
+from requests import Session, Response, ConnectionError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException, Timeout
 
 from .errors import BeelinePBXException
+from .base import BaseBeelinePBX
+from .utils import Endpoint
+from .metrics import RequestObserver
+from .singleflight import SingleFlight
+from .jsonstream import iter_json_array
+from .codecs import JsonCodec
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter, release_on_close
 from .models import (
     Abonent,
     BwlStatusResponse,
@@ -27,28 +48,120 @@ from .models import (
     VoiceCampaignMessage,
     VoiceCampaignQuestion,
     VoiceCampaignInfoReport,
+    VoiceCampaignInfoNumber,
 )
+from .batch import StatRecordBatch
+from .recording import CHANGED, UNCHANGED, RecordingChange, recording_status
+from .lazy import LazyVoiceCampaignInfoReport
 
 
-class BeelinePBX(object):
-    API_URL = 'https://cloudpbx.beeline.ru/apis/portal/'
-
-    def __init__(self, access_token: str):
-        self.access_token = access_token
+class BeelinePBX(BaseBeelinePBX):
+    def __init__(
+        self,
+        access_token: str,
+        pool_size: int = 10,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Union[float, Tuple[float, float], None] = (10, 60),
+        rate_limiter: Optional[RateLimiter] = None,
+        json_codec: Union[JsonCodec, str, None] = None,
+        observers: Optional[List[RequestObserver]] = None,
+        coalesce_requests: bool = False,
+    ):
+        super().__init__(
+            access_token,
+            pool_size,
+            retry_policy,
+            timeout,
+            rate_limiter,
+            json_codec,
+            observers,
+            SingleFlight() if coalesce_requests else None,
+        )
         self.session = self._init_session()
 
     def _init_session(self) -> Session:
         session = Session()
         session.headers['X-MPBX-API-AUTH-TOKEN'] = self.access_token
+        session.mount('https://', HTTPAdapter(pool_maxsize=self.pool_size))
+        session.mount('http://', HTTPAdapter(pool_maxsize=self.pool_size))
         return session
 
-    def _generate_request_url(
-        self, endpoint: str, params: Optional[dict] = None
-    ) -> str:
-        url = f'{self.API_URL}{endpoint}'
-        if params:
-            url = f'{url}?{urlencode(params)}'
-        return url
+    def _request(
+        self,
+        http_method: str,
+        endpoint: str,
+        params: Optional[dict] = None,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> Response:
+        url = self._generate_request_url(endpoint, params)
+        template, started = self._start_request(http_method, endpoint)
+        method = getattr(self.session, http_method)
+        attempt = 0
+        r = None
+        try:
+            while True:
+                attempt += 1
+                r = None
+                try:
+                    r = self._send(method, url, **kwargs)
+                except (ConnectionError, Timeout):
+                    delay = self.retry_policy.retry_delay(
+                        attempt, http_method, idempotent=idempotent
+                    )
+                    if delay is None:
+                        raise self._connection_error()
+                    time.sleep(delay)
+                    continue
+                except RequestException:
+                    # e.g. ChunkedEncodingError while reading the body
+                    raise self._connection_error()
+                delay = self.retry_policy.retry_delay(
+                    attempt,
+                    http_method,
+                    r.status_code,
+                    r.headers.get('Retry-After'),
+                    idempotent,
+                )
+                if delay is None:
+                    return r
+                r.close()
+                time.sleep(delay)
+        finally:
+            if self.observers:
+                self._end_request(
+                    template,
+                    http_method,
+                    r.status_code if r is not None else None,
+                    len(kwargs.get('data') or b''),
+                    self._received_bytes(r, kwargs.get('stream', False)),
+                    started,
+                    attempt,
+                )
+
+    def _send(self, method: Callable[..., Response], url: str, **kwargs) -> Response:
+        if self.rate_limiter is None:
+            return method(url, timeout=self.timeout, **kwargs)
+        release = self.rate_limiter.acquire()
+        try:
+            r = method(url, timeout=self.timeout, **kwargs)
+        except BaseException:
+            release()
+            raise
+        if kwargs.get('stream'):
+            # the body is still downloading, the slot is kept until close
+            release_on_close(r, release, 'close')
+        else:
+            release()
+        return r
+
+    @staticmethod
+    def _received_bytes(r: Optional[Response], stream: bool) -> int:
+        if r is None:
+            return 0
+        if not stream:
+            return len(r.content)
+        return int(r.headers.get('Content-Length') or 0)
 
     def _send_api_request(
         self,
@@ -58,65 +171,262 @@ class BeelinePBX(object):
         data: Union[Optional[dict], Optional[list], Optional[str]] = None,
         file_: bool = False,
         audio_file: bool = False,
+        idempotent: Optional[bool] = None,
     ) -> Any:
-        url = self._generate_request_url(endpoint, params)
-        method = getattr(self.session, http_method)
+        key = self._coalesce_key(http_method, endpoint, params, data, file_)
+        if self.single_flight is not None and key is not None:
+            return self.single_flight.do(
+                key,
+                lambda: self._perform_api_request(
+                    http_method, endpoint, params, data, file_, audio_file, idempotent
+                ),
+            )
+        return self._perform_api_request(
+            http_method, endpoint, params, data, file_, audio_file, idempotent
+        )
+
+    def _perform_api_request(
+        self,
+        http_method: str,
+        endpoint: str,
+        params: Optional[dict] = None,
+        data: Union[Optional[dict], Optional[list], Optional[str]] = None,
+        file_: bool = False,
+        audio_file: bool = False,
+        idempotent: Optional[bool] = None,
+    ) -> Any:
+        if audio_file:
+            r = self._request(http_method, endpoint, params, idempotent, data=data)
+        elif data is not None:
+            r = self._request(
+                http_method,
+                endpoint,
+                params,
+                idempotent,
+                data=self.json_codec.dumps(data),
+                headers={'Content-Type': 'application/json'},
+            )
+        else:
+            r = self._request(http_method, endpoint, params, idempotent)
         try:
-            r = method(url, json=data) if not audio_file else method(url, data=data)
+            response = self.json_codec.loads(r.content) if not file_ else r.content
+        except ValueError:
+            return r.text
+        if r.status_code > 204:
+            raise BeelinePBXException(response)
+        return response
+
+    def _stream_api_request(
+        self,
+        endpoint: str,
+        headers: Optional[dict] = None,
+        params: Optional[dict] = None,
+    ) -> Response:
+        r = self._request('get', endpoint, params, headers=headers, stream=True)
+        if r.status_code > 206:
             try:
-                response = r.json() if not file_ else r.content
-            except JSONDecodeError:
-                return r.text
-            if r.status_code > 204:
-                raise BeelinePBXException(response)
-            return response
-        except (ConnectionError, ConnectTimeout):
-            raise BeelinePBXException(
-                {
-                    'errorCode': 500,
-                    'description': 'Connection Error or cant',
-                }
-            )
+                response = self._error_response(r.status_code, r.content)
+            finally:
+                r.close()
+            raise BeelinePBXException(response)
+        return r
+
+    def _iter_json_array(
+        self,
+        endpoint: str,
+        params: Optional[dict] = None,
+        key: Optional[str] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator:
+        with self._stream_api_request(endpoint, params=params) as r:
+            try:
+                yield from iter_json_array(
+                    r.iter_content(chunk_size), key, self.json_codec.loads
+                )
+            except RequestException:
+                raise self._connection_error()
+
+    def _open_download(self, endpoint: str, offset: int) -> Response:
+        if not offset:
+            return self._stream_api_request(endpoint)
+        try:
+            r = self._stream_api_request(endpoint, {'Range': f'bytes={offset}-'})
+        except BeelinePBXException:
+            # e.g. 416 for a stale partial file, start from scratch
+            return self._stream_api_request(endpoint)
+        if r.status_code != 206:
+            return r
+        content_range = r.headers.get('Content-Range', '')
+        if not content_range.startswith(f'bytes {offset}-'):
+            r.close()
+            return self._stream_api_request(endpoint)
+        return r
+
+    def _download_to(
+        self,
+        endpoint: str,
+        dest: Union[str, BinaryIO],
+        chunk_size: int,
+        resume: bool = False,
+        expected_size: Optional[int] = None,
+    ) -> int:
+        offset = self._download_offset(dest, resume, expected_size)
+        if offset is None:
+            return 0
+        written = 0
+        with self._open_download(endpoint, offset) as r:
+            if r.status_code != 206:
+                offset = 0
+            f = open(dest, 'ab' if offset else 'wb') if isinstance(dest, str) else dest
+            try:
+                for chunk in r.iter_content(chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+            except RequestException:
+                raise self._connection_error()
+            finally:
+                if isinstance(dest, str):
+                    f.close()
+        self._check_download_size(offset + written, expected_size)
+        return written
+
+    def _fan_out(
+        self, fn: Callable[..., Any], args: Dict[str, tuple], max_workers: int
+    ) -> Dict[str, Any]:
+        def call(key: str) -> Any:
+            try:
+                return fn(*args[key])
+            except BeelinePBXException as e:
+                return e
+            except Exception as e:
+                # fails this key only, the other results are kept
+                return self._unexpected_error(e)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(args, executor.map(call, args)))
 
     def get_abonents(self) -> map:
         response = self._send_api_request('get', 'abonents')
         return map(Abonent.from_beeline_struct, response)
 
     def find_abonent(self, pattern: str) -> Abonent:
-        response = self._send_api_request('get', f'abonents/{pattern}')
+        response = self._send_api_request(
+            'get', Endpoint('abonents/{pattern}', pattern=pattern)
+        )
         return Abonent.from_beeline_struct(response)
 
     def get_abonent_agent_status(self, pattern: str) -> dict:
-        status = self._send_api_request('get', f'abonents/{pattern}/agent')
+        status = self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/agent', pattern=pattern)
+        )
         return {'status': status}
 
     def set_abonent_agent_status(self, pattern: str, status: str) -> dict:
         _ = self._send_api_request(
-            'put', f'abonents/{pattern}/agent', data={'status': status}
+            'put',
+            Endpoint('abonents/{pattern}/agent', pattern=pattern),
+            data={'status': status},
         )
         return {}
 
+    def get_agent_statuses(
+        self, patterns: List[str], max_workers: Optional[int] = None
+    ) -> Dict[str, Union[dict, BeelinePBXException]]:
+        return self._fan_out(
+            self.get_abonent_agent_status,
+            {pattern: (pattern,) for pattern in patterns},
+            max_workers or self.pool_size,
+        )
+
+    def set_agent_statuses(
+        self, statuses: Dict[str, str], max_workers: Optional[int] = None
+    ) -> Dict[str, Union[dict, BeelinePBXException]]:
+        return self._fan_out(
+            self.set_abonent_agent_status,
+            {pattern: (pattern, status) for pattern, status in statuses.items()},
+            max_workers or self.pool_size,
+        )
+
     def get_abonent_recording_status(self, pattern: str) -> dict:
-        status = self._send_api_request('get', f'abonents/{pattern}/recording')
+        status = self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/recording', pattern=pattern)
+        )
         return {'status': status}
 
     def enable_abonent_recording(self, pattern: str) -> dict:
-        _ = self._send_api_request('put', f'abonents/{pattern}/recording')
+        _ = self._send_api_request(
+            'put', Endpoint('abonents/{pattern}/recording', pattern=pattern)
+        )
         return {}
 
     def stop_abonent_recording(self, pattern: str) -> dict:
-        _ = self._send_api_request('delete', f'abonents/{pattern}/recording')
+        _ = self._send_api_request(
+            'delete', Endpoint('abonents/{pattern}/recording', pattern=pattern)
+        )
         return {}
 
+    def _set_abonent_recording(self, pattern: str, enable: bool) -> RecordingChange:
+        previous_status = self.get_abonent_recording_status(pattern)['status']
+        if previous_status == recording_status(enable):
+            return RecordingChange(pattern, previous_status, UNCHANGED)
+        if enable:
+            self.enable_abonent_recording(pattern)
+        else:
+            self.stop_abonent_recording(pattern)
+        return RecordingChange(pattern, previous_status, CHANGED)
+
+    def set_abonents_recording(
+        self,
+        enable: bool,
+        patterns: Optional[List[str]] = None,
+        department: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Union[RecordingChange, BeelinePBXException]]:
+        """Enable or stop call recording of ``patterns`` and a ``department``.
+
+        The recording status of every abonent is read first, only abonents
+        with a different status are written.
+        """
+        patterns = list(patterns or [])
+        if department is not None:
+            patterns += [
+                a.user_id for a in self.get_abonents() if a.department == department
+            ]
+        return self._fan_out(
+            self._set_abonent_recording,
+            {pattern: (pattern, enable) for pattern in patterns},
+            max_workers or self.pool_size,
+        )
+
+    def enable_abonents_recording(
+        self,
+        patterns: Optional[List[str]] = None,
+        department: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Union[RecordingChange, BeelinePBXException]]:
+        return self.set_abonents_recording(True, patterns, department, max_workers)
+
+    def stop_abonents_recording(
+        self,
+        patterns: Optional[List[str]] = None,
+        department: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Union[RecordingChange, BeelinePBXException]]:
+        return self.set_abonents_recording(False, patterns, department, max_workers)
+
     def call_from_abonent(self, pattern: str, phone_number: str) -> dict:
         response = self._send_api_request(
-            'post', f'abonents/{pattern}/call', {'phoneNumber': phone_number}
+            'post',
+            Endpoint('abonents/{pattern}/call', pattern=pattern),
+            {'phoneNumber': phone_number},
         )
         return {'response': response}
 
     def call_from_abonent_v2(self, pattern: str, phone_number: str) -> dict:
         response = self._send_api_request(
-            'post', f'v2/abonents/{pattern}/call', {'phoneNumber': phone_number}
+            'post',
+            Endpoint('v2/abonents/{pattern}/call', pattern=pattern),
+            {'phoneNumber': phone_number},
         )
         return {'response': response}
 
@@ -125,7 +435,7 @@ class BeelinePBX(object):
     ) -> dict:
         _ = self._send_api_request(
             'post',
-            f'abonents/{pattern}/callTransfer',
+            Endpoint('abonents/{pattern}/callTransfer', pattern=pattern),
             {'callId': call_id, 'phoneNumber': phone_number},
         )
         return {}
@@ -135,7 +445,7 @@ class BeelinePBX(object):
     ) -> dict:
         _ = self._send_api_request(
             'post',
-            f'abonents/{pattern}/callTransferConsult',
+            Endpoint('abonents/{pattern}/callTransferConsult', pattern=pattern),
             {'callId': call_id, 'callIdConsult': call_id_consult},
         )
         return {}
@@ -145,7 +455,7 @@ class BeelinePBX(object):
     ) -> dict:
         _ = self._send_api_request(
             'put',
-            f'abonents/{pattern}/number',
+            Endpoint('abonents/{pattern}/number', pattern=pattern),
             {'phoneNumber': phone_number, 'schedule': schedule},
         )
         return {}
@@ -153,63 +463,82 @@ class BeelinePBX(object):
     def delete_extension_number(self, pattern: str) -> dict:
         _ = self._send_api_request(
             'delete',
-            f'abonents/{pattern}/number',
+            Endpoint('abonents/{pattern}/number', pattern=pattern),
         )
         return {}
 
     def get_cfb(self, pattern: str) -> CfbResponse:
-        response = self._send_api_request('get', f'abonents/{pattern}/cfb')
+        response = self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/cfb', pattern=pattern)
+        )
         return CfbResponse.from_beeline_struct(response)
 
     def enable_cfb(self, pattern: str, cfb: Cfb) -> dict:
         _ = self._send_api_request(
-            'put', f'abonents/{pattern}/cfb', data=cfb.to_beeline_struct()
+            'put',
+            Endpoint('abonents/{pattern}/cfb', pattern=pattern),
+            data=cfb.to_beeline_struct(),
         )
         return {}
 
     def stop_cfb(self, pattern: str) -> dict:
         _ = self._send_api_request(
             'delete',
-            f'abonents/{pattern}/cfb',
+            Endpoint('abonents/{pattern}/cfb', pattern=pattern),
         )
         return {}
 
     def get_cfs_rules(self, pattern: str) -> CfsStatusResponse:
-        response = self._send_api_request('get', f'abonents/{pattern}/cfs')
+        response = self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/cfs', pattern=pattern)
+        )
         return CfsStatusResponse.from_beeline_struct(response)
 
     def add_cfs_rule(self, pattern: str, cfs_rule: CfsRule) -> dict:
         response = self._send_api_request(
-            'post', f'abonents/{pattern}/cfs', data=cfs_rule.to_beeline_struct()
+            'post',
+            Endpoint('abonents/{pattern}/cfs', pattern=pattern),
+            data=cfs_rule.to_beeline_struct(),
         )
         return {'number': response}
 
     def enable_cfs(self, pattern: str) -> dict:
-        _ = self._send_api_request('put', f'abonents/{pattern}/cfs')
+        _ = self._send_api_request(
+            'put', Endpoint('abonents/{pattern}/cfs', pattern=pattern)
+        )
         return {}
 
     def update_cfs_rule(self, pattern: str, cfs_id: str, cfs_rule: CfsRule) -> dict:
         _ = self._send_api_request(
-            'put', f'abonents/{pattern}/cfs/{cfs_id}', data=cfs_rule.to_beeline_struct()
+            'put',
+            Endpoint('abonents/{pattern}/cfs/{cfs_id}', pattern=pattern, cfs_id=cfs_id),
+            data=cfs_rule.to_beeline_struct(),
         )
         return {}
 
     def stop_cfs(self, pattern: str) -> dict:
-        _ = self._send_api_request('delete', f'abonents/{pattern}/cfs')
+        _ = self._send_api_request(
+            'delete', Endpoint('abonents/{pattern}/cfs', pattern=pattern)
+        )
         return {}
 
     def delete_cfs_rule(self, pattern: str, cfs_id: str) -> dict:
-        _ = self._send_api_request('delete', f'abonents/{pattern}/cfs/{cfs_id}')
+        _ = self._send_api_request(
+            'delete',
+            Endpoint('abonents/{pattern}/cfs/{cfs_id}', pattern=pattern, cfs_id=cfs_id),
+        )
         return {}
 
     def get_bwl_list(self, pattern: str) -> BwlStatusResponse:
-        response = self._send_api_request('get', f'abonents/{pattern}/bwl')
+        response = self._send_api_request(
+            'get', Endpoint('abonents/{pattern}/bwl', pattern=pattern)
+        )
         return BwlStatusResponse.from_beeline_struct(response)
 
     def add_bwl_rule(self, pattern: str, type_: str, bwl_rule: BwlRule) -> dict:
         response = self._send_api_request(
             'post',
-            f'abonents/{pattern}/bwl',
+            Endpoint('abonents/{pattern}/bwl', pattern=pattern),
             data={'type': type_, 'rule': bwl_rule.to_beeline_struct()},
         )
         return {'number': response}
@@ -217,66 +546,147 @@ class BeelinePBX(object):
     def update_bwl_rule(self, pattern: str, bwl_id: str, bwl_rule: BwlRule) -> dict:
         _ = self._send_api_request(
             'post',
-            f'abonents/{pattern}/bwl/{bwl_id}',
+            Endpoint('abonents/{pattern}/bwl/{bwl_id}', pattern=pattern, bwl_id=bwl_id),
             data=bwl_rule.to_beeline_struct(),
         )
         return {}
 
     def enable_bwl(self, pattern: str, rule_type: str) -> dict:
         _ = self._send_api_request(
-            'put', f'abonents/{pattern}/bwl', {'ruleType': rule_type}
+            'put',
+            Endpoint('abonents/{pattern}/bwl', pattern=pattern),
+            {'ruleType': rule_type},
         )
         return {}
 
     def stop_bwl(self, pattern: str) -> dict:
-        _ = self._send_api_request('delete', f'abonents/{pattern}/bwl')
+        _ = self._send_api_request(
+            'delete', Endpoint('abonents/{pattern}/bwl', pattern=pattern)
+        )
         return {}
 
     def delete_bwl_rule(self, pattern: str, bwl_id: str) -> dict:
-        _ = self._send_api_request('delete', f'abonents/{pattern}/bwl/{bwl_id}')
+        _ = self._send_api_request(
+            'delete',
+            Endpoint('abonents/{pattern}/bwl/{bwl_id}', pattern=pattern, bwl_id=bwl_id),
+        )
         return {}
 
-    def get_records(self, params: Optional[dict] = None) -> map:
+    def get_records(
+        self,
+        params: Optional[dict] = None,
+        compact: bool = False,
+        lazy: bool = False,
+    ) -> map:
         response = self._send_api_request('get', 'records', params=params)
-        return map(CallRecord.from_beeline_struct, response)
+        model = self._call_record_model(compact, lazy)
+        return map(model.from_beeline_struct, response)
 
     def delete_record(self, record_id: str) -> dict:
-        _ = self._send_api_request('delete', f'v2/records/{record_id}')
+        _ = self._send_api_request(
+            'delete', Endpoint('v2/records/{record_id}', record_id=record_id)
+        )
         return {}
 
+    def iter_records(
+        self,
+        params: Optional[dict] = None,
+        compact: bool = False,
+        lazy: bool = False,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[CallRecord]:
+        model = self._call_record_model(compact, lazy)
+        for item in self._iter_json_array('records', params, chunk_size=chunk_size):
+            yield model.from_beeline_struct(item)
+
     def get_record(self, record_id: str) -> CallRecord:
-        response = self._send_api_request('get', f'v2/records/{record_id}')
+        response = self._send_api_request(
+            'get', Endpoint('v2/records/{record_id}', record_id=record_id)
+        )
         return CallRecord.from_beeline_struct(response)
 
-    def get_record_by_external_id(
-        self, external_id: str, user_id: str
-    ) -> CallRecord:
+    def get_record_by_external_id(self, external_id: str, user_id: str) -> CallRecord:
         response = self._send_api_request(
-            'get', f'v2/records/{external_id}/{user_id}'
+            'get',
+            Endpoint(
+                'v2/records/{external_id}/{user_id}',
+                external_id=external_id,
+                user_id=user_id,
+            ),
         )
         return CallRecord.from_beeline_struct(response)
 
     def download_record(self, record_id: str) -> bytes:
         response = self._send_api_request(
-            'get', f'v2/records/{record_id}/download', file_=True
+            'get',
+            Endpoint('v2/records/{record_id}/download', record_id=record_id),
+            file_=True,
         )
         return response
 
-    def download_record_by_external_id(
-        self, external_id: str, user_id: str
-    ) -> bytes:
+    def download_record_by_external_id(self, external_id: str, user_id: str) -> bytes:
         response = self._send_api_request(
-            'get', f'v2/records/{external_id}/{user_id}/download', file_=True
+            'get',
+            Endpoint(
+                'v2/records/{external_id}/{user_id}/download',
+                external_id=external_id,
+                user_id=user_id,
+            ),
+            file_=True,
         )
         return response
 
+    def download_record_to(
+        self,
+        record_id: str,
+        dest: Union[str, BinaryIO],
+        chunk_size: int = 64 * 1024,
+        resume: bool = False,
+        expected_size: Optional[int] = None,
+    ) -> int:
+        return self._download_to(
+            Endpoint('v2/records/{record_id}/download', record_id=record_id),
+            dest,
+            chunk_size,
+            resume,
+            expected_size,
+        )
+
+    def download_record_by_external_id_to(
+        self,
+        external_id: str,
+        user_id: str,
+        dest: Union[str, BinaryIO],
+        chunk_size: int = 64 * 1024,
+        resume: bool = False,
+        expected_size: Optional[int] = None,
+    ) -> int:
+        return self._download_to(
+            Endpoint(
+                'v2/records/{external_id}/{user_id}/download',
+                external_id=external_id,
+                user_id=user_id,
+            ),
+            dest,
+            chunk_size,
+            resume,
+            expected_size,
+        )
+
     def get_record_link(self, record_id: str) -> str:
-        response = self._send_api_request('get', f'records/{record_id}/reference')
+        response = self._send_api_request(
+            'get', Endpoint('records/{record_id}/reference', record_id=record_id)
+        )
         return response
 
     def get_record_link_by_external_id(self, external_id: str, user_id: str) -> str:
         response = self._send_api_request(
-            'get', f'records/{external_id}/{user_id}/reference'
+            'get',
+            Endpoint(
+                'records/{external_id}/{user_id}/reference',
+                external_id=external_id,
+                user_id=user_id,
+            ),
         )
         return response
 
@@ -285,12 +695,18 @@ class BeelinePBX(object):
         return map(Number.from_beeline_struct, response)
 
     def find_incoming_number(self, pattern: str) -> Number:
-        response = self._send_api_request('get', f'numbers/{pattern}')
+        response = self._send_api_request(
+            'get', Endpoint('numbers/{pattern}', pattern=pattern)
+        )
         return Number.from_beeline_struct(response)
 
     def create_subscription(self, subscription: SubscriptionRequest) -> dict:
+        # every call creates a new subscription, a retry would duplicate it
         response = self._send_api_request(
-            'put', 'subscription', data=subscription.to_beeline_struct()
+            'put',
+            'subscription',
+            data=subscription.to_beeline_struct(),
+            idempotent=False,
         )
         return response
 
@@ -367,38 +783,54 @@ class BeelinePBX(object):
 
     def update_voice_campaign(self, campaign_id: str, campaign: VoiceCampaign) -> dict:
         _ = self._send_api_request(
-            'put', f'vc/{campaign_id}', data=campaign.to_beeline_struct()
+            'put',
+            Endpoint('vc/{campaign_id}', campaign_id=campaign_id),
+            data=campaign.to_beeline_struct(),
         )
         return {}
 
     def delete_voice_campaign(self, campaign_id: str) -> dict:
         _ = self._send_api_request(
             'delete',
-            f'vc/{campaign_id}',
+            Endpoint('vc/{campaign_id}', campaign_id=campaign_id),
         )
         return {}
 
     def stop_voice_campaign(self, campaign_id: str) -> dict:
         _ = self._send_api_request(
             'put',
-            f'vc/stop/{campaign_id}',
+            Endpoint('vc/stop/{campaign_id}', campaign_id=campaign_id),
         )
         return {}
 
     def start_voice_campaign(self, campaign_id: str) -> dict:
         _ = self._send_api_request(
             'put',
-            f'vc/start/{campaign_id}',
+            Endpoint('vc/start/{campaign_id}', campaign_id=campaign_id),
         )
         return {}
 
-    def get_voice_campaign_info(self, campaign_id: str) -> VoiceCampaignInfoReport:
+    def get_voice_campaign_info(
+        self, campaign_id: str, lazy: bool = False
+    ) -> VoiceCampaignInfoReport:
         response = self._send_api_request(
             'get',
-            f'vc/info/{campaign_id}',
+            Endpoint('vc/info/{campaign_id}', campaign_id=campaign_id),
         )
+        if lazy:
+            return LazyVoiceCampaignInfoReport(response)  # type: ignore
         return VoiceCampaignInfoReport.from_beeline_struct(response)
 
+    def iter_voice_campaign_info_numbers(
+        self, campaign_id: str, chunk_size: int = 64 * 1024
+    ) -> Iterator[VoiceCampaignInfoNumber]:
+        for item in self._iter_json_array(
+            Endpoint('vc/info/{campaign_id}', campaign_id=campaign_id),
+            key='numberList',
+            chunk_size=chunk_size,
+        ):
+            yield VoiceCampaignInfoNumber.from_beeline_struct(item)
+
     def get_statistic(
         self,
         user_id: str,
@@ -406,16 +838,12 @@ class BeelinePBX(object):
         date_to: datetime,
         page: int = 0,
         page_size: int = 100,
+        compact: bool = False,
     ) -> map:
-        params = {
-            'userId': user_id,
-            'dateFrom': date_from.strftime('%Y-%m-%dT%H:%M:%SZ'),
-            'dateTo': date_to.strftime('%Y-%m-%dT%H:%M:%SZ'),
-            'page': page,
-            'pageSize': page_size,
-        }
+        params = self._statistic_params(user_id, date_from, date_to, page, page_size)
         response = self._send_api_request('get', 'statistics', params)
-        return map(StatRecord.from_beeline_struct, response)
+        model = self._stat_record_model(compact)
+        return map(model.from_beeline_struct, response)
 
     def get_v2_statistic(
         self,
@@ -424,13 +852,70 @@ class BeelinePBX(object):
         date_to: datetime,
         page: int = 0,
         page_size: int = 100,
+        compact: bool = False,
+        lazy: bool = False,
     ) -> map:
-        params = {
-            'userId': user_id,
-            'dateFrom': date_from.strftime('%Y-%m-%dT%H:%M:%SZ'),
-            'dateTo': date_to.strftime('%Y-%m-%dT%H:%M:%SZ'),
-            'page': page,
-            'pageSize': page_size,
-        }
+        params = self._statistic_params(user_id, date_from, date_to, page, page_size)
+        response = self._send_api_request('get', 'v2/statistics', params)
+        model = self._stat_record_v2_model(compact, lazy)
+        return map(model.from_beeline_struct, response)
+
+    def get_v2_statistic_batch(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page: int = 0,
+        page_size: int = 100,
+    ) -> StatRecordBatch:
+        params = self._statistic_params(user_id, date_from, date_to, page, page_size)
         response = self._send_api_request('get', 'v2/statistics', params)
-        return map(StatRecordV2.from_beeline_struct, response)
+        return StatRecordBatch.from_beeline_struct(response)
+
+    def _iter_pages(self, fetch_page: Callable[[int], map], page_size: int) -> Iterator:
+        # pages are decoded in the prefetch thread within the caller's context
+        context = copy_context()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = 0
+            future = executor.submit(context.run, lambda p=page: list(fetch_page(p)))
+            while future is not None:
+                records = future.result()
+                if len(records) < page_size:
+                    future = None
+                else:
+                    page += 1
+                    future = executor.submit(
+                        context.run, lambda p=page: list(fetch_page(p))
+                    )
+                yield from records
+
+    def iter_statistic(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page_size: int = 100,
+        compact: bool = False,
+    ) -> Iterator[StatRecord]:
+        return self._iter_pages(
+            lambda page: self.get_statistic(
+                user_id, date_from, date_to, page, page_size, compact
+            ),
+            page_size,
+        )
+
+    def iter_v2_statistic(
+        self,
+        user_id: str,
+        date_from: datetime,
+        date_to: datetime,
+        page_size: int = 100,
+        compact: bool = False,
+        lazy: bool = False,
+    ) -> Iterator[StatRecordV2]:
+        return self._iter_pages(
+            lambda page: self.get_v2_statistic(
+                user_id, date_from, date_to, page, page_size, compact, lazy
+            ),
+            page_size,
+        )
@@ -0,0 +1,74 @@
+import json
+from typing import Any, Dict, Optional, Type
+
+
+class JsonCodec(object):
+    """Encodes request bodies to and decodes response bodies from bytes.
+
+    ``loads`` must raise ``ValueError`` (or a subclass) for invalid input.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(obj).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return self._ujson.loads(data)
+
+
+JSON_CODECS: Dict[str, Type[JsonCodec]] = {
+    'json': JsonCodec,
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+}
+
+
+def get_json_codec(name: Optional[str] = None) -> JsonCodec:
+    """Return a codec by name, or the fastest installed one for ``'auto'``.
+
+    ``None`` returns the stdlib codec.
+    """
+    if name is None:
+        return JsonCodec()
+    if name == 'auto':
+        for codec in (OrjsonCodec, UjsonCodec):
+            try:
+                return codec()
+            except ImportError:
+                continue
+        return JsonCodec()
+    try:
+        return JSON_CODECS[name]()
+    except KeyError:
+        raise ValueError(f'Unknown json codec {name}')
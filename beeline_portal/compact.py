@@ -0,0 +1,46 @@
+"""Slotted variants of the high-volume models.
+
+The classes below have the same fields, ``from_beeline_struct`` and
+``to_beeline_struct`` as their counterparts in ``models`` but store
+attributes in ``__slots__`` instead of a per-instance ``__dict__``, which
+makes large statistic and record sets several times smaller in memory.
+"""
+from dataclasses import fields
+from typing import Type, TypeVar
+
+from .models import (
+    Abonent,
+    CallRecord,
+    StatRecord,
+    StatRecordV2,
+    VoiceCampaignInfoNumber,
+)
+
+
+T = TypeVar('T')
+
+
+def slotted(cls: Type[T], name: str = '', **attributes) -> Type[T]:
+    """Return a copy of dataclass ``cls`` that keeps its fields in ``__slots__``.
+
+    ``attributes`` replace class attributes of the copy, e.g. the nested
+    ``abonent_model``.
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        if key not in field_names and key not in ('__dict__', '__weakref__')
+    }
+    namespace.update(attributes)
+    namespace['__slots__'] = field_names
+    name = name or f'Compact{cls.__name__}'
+    namespace['__qualname__'] = name
+    return type(cls)(name, cls.__bases__, namespace)
+
+
+CompactAbonent = slotted(Abonent)
+CompactVoiceCampaignInfoNumber = slotted(VoiceCampaignInfoNumber)
+CompactStatRecord = slotted(StatRecord, abonent_model=CompactAbonent)
+CompactStatRecordV2 = slotted(StatRecordV2, abonent_model=CompactAbonent)
+CompactCallRecord = slotted(CallRecord, abonent_model=CompactAbonent)
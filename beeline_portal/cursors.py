@@ -0,0 +1,84 @@
+"""Persistent cursors of incremental syncs.
+
+A cursor is a JSON-serializable dict saved under a name. ``FileCursorStore``
+keeps all cursors in one JSON file, ``SQLiteCursorStore`` in a table of an
+SQLite database (e.g. the ``StatisticStore`` one).
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional, Union
+
+
+class CursorStore(object):
+    def load(self, name: str) -> Optional[dict]:
+        raise NotImplementedError()
+
+    def save(self, name: str, cursor: dict) -> None:
+        raise NotImplementedError()
+
+
+class MemoryCursorStore(CursorStore):
+    def __init__(self):
+        self.cursors: Dict[str, dict] = {}
+
+    def load(self, name: str) -> Optional[dict]:
+        return self.cursors.get(name)
+
+    def save(self, name: str, cursor: dict) -> None:
+        self.cursors[name] = cursor
+
+
+class FileCursorStore(CursorStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def load(self, name: str) -> Optional[dict]:
+        with self._lock:
+            return self._read().get(name)
+
+    def save(self, name: str, cursor: dict) -> None:
+        with self._lock:
+            cursors = self._read()
+            cursors[name] = cursor
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(cursors, f)
+            os.replace(tmp_path, self.path)
+
+
+class SQLiteCursorStore(CursorStore):
+    def __init__(self, database: Union[str, sqlite3.Connection]):
+        self.connection = (
+            database
+            if isinstance(database, sqlite3.Connection)
+            else sqlite3.connect(database, check_same_thread=False)
+        )
+        self._lock = threading.Lock()
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS sync_cursors '
+                '(name TEXT PRIMARY KEY, cursor TEXT NOT NULL)'
+            )
+
+    def load(self, name: str) -> Optional[dict]:
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT cursor FROM sync_cursors WHERE name = ?', (name,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, name: str, cursor: dict) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO sync_cursors VALUES (?, ?)',
+                (name, json.dumps(cursor)),
+            )
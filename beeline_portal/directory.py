@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from .client import BeelinePBX
+from .models import Abonent
+
+
+class AbonentDirectory(object):
+    """In-memory copy of ``get_abonents`` that is reloaded every ``ttl`` seconds.
+
+    Abonents are indexed by ``user_id``, ``extension``, ``phone``, ``email``
+    and ``department``; ``find_abonent`` resolves a pattern from the indexes
+    and only asks the portal when none of them matches.
+    """
+
+    UNIQUE_INDEXES = ('user_id', 'extension', 'phone', 'email')
+
+    def __init__(self, client: BeelinePBX, ttl: float = 300):
+        self.client = client
+        self.ttl = ttl
+        self._abonents: List[Abonent] = []
+        self._indexes: Dict[str, Dict[str, Abonent]] = {}
+        self._departments: Dict[str, List[Abonent]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_expired(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def refresh(self) -> None:
+        abonents = list(self.client.get_abonents())
+        indexes: Dict[str, Dict[str, Abonent]] = {
+            field: {} for field in self.UNIQUE_INDEXES
+        }
+        departments: Dict[str, List[Abonent]] = defaultdict(list)
+        for abonent in abonents:
+            for field in self.UNIQUE_INDEXES:
+                value = getattr(abonent, field)
+                if value:
+                    indexes[field][value] = abonent
+            if abonent.department:
+                departments[abonent.department].append(abonent)
+        self._abonents = abonents
+        self._indexes = indexes
+        self._departments = dict(departments)
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def _ensure_fresh(self) -> None:
+        if not self.is_expired:
+            return
+        with self._lock:
+            if self.is_expired:
+                self.refresh()
+
+    def get_abonents(self) -> List[Abonent]:
+        self._ensure_fresh()
+        return list(self._abonents)
+
+    def get(self, field: str, value: str) -> Optional[Abonent]:
+        if field not in self.UNIQUE_INDEXES:
+            raise ValueError(f'{field} is not indexed')
+        self._ensure_fresh()
+        return self._indexes[field].get(value)
+
+    def get_department(self, department: str) -> List[Abonent]:
+        self._ensure_fresh()
+        return list(self._departments.get(department, []))
+
+    def find_abonent(self, pattern: str) -> Abonent:
+        self._ensure_fresh()
+        for field in self.UNIQUE_INDEXES:
+            abonent = self._indexes[field].get(pattern)
+            if abonent is not None:
+                return abonent
+        return self.client.find_abonent(pattern)
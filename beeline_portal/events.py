@@ -0,0 +1,100 @@
+"""Typed models of the events the portal posts to a subscription ``url``.
+
+Events are XSI ``Event`` XML documents, ``parse_event`` turns one into a
+``SubscriptionEvent``. Call events (``CallReceivedEvent``,
+``CallAnsweredEvent``, ``CallReleasedEvent``, ...) carry the ``Call``.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from xml.etree import ElementTree
+
+from .utils import parse_datetime_from_milliseconds
+
+
+XSI_NAMESPACE = 'http://schema.broadsoft.com/xsi'
+XML_SCHEMA_INSTANCE_NAMESPACE = 'http://www.w3.org/2001/XMLSchema-instance'
+
+_XSI = f'{{{XSI_NAMESPACE}}}'
+_TYPE = f'{{{XML_SCHEMA_INSTANCE_NAMESPACE}}}type'
+
+
+def _text(element: ElementTree.Element, path: str) -> Optional[str]:
+    child = element.find('/'.join(_XSI + part for part in path.split('/')))
+    return child.text if child is not None and child.text else None
+
+
+def _datetime(element: ElementTree.Element, path: str) -> Optional[datetime]:
+    value = _text(element, path)
+    return parse_datetime_from_milliseconds(int(value)) if value else None
+
+
+def _local_type(element: ElementTree.Element) -> str:
+    # 'xsi:CallReceivedEvent' -> 'CallReceivedEvent'
+    return element.get(_TYPE, '').rpartition(':')[2]
+
+
+@dataclass
+class Call:
+    call_id: str
+    ext_tracking_id: Optional[str] = None
+    personality: Optional[str] = None
+    state: Optional[str] = None
+    remote_address: Optional[str] = None
+    remote_call_type: Optional[str] = None
+    start_time: Optional[datetime] = None
+    answer_time: Optional[datetime] = None
+    release_time: Optional[datetime] = None
+
+    @classmethod
+    def from_xml(cls, element: ElementTree.Element) -> 'Call':
+        return cls(
+            _text(element, 'callId'),  # type: ignore
+            _text(element, 'extTrackingId'),
+            _text(element, 'personality'),
+            _text(element, 'state'),
+            _text(element, 'remoteParty/address'),
+            _text(element, 'remoteParty/callType'),
+            _datetime(element, 'startTime'),
+            _datetime(element, 'answerTime'),
+            _datetime(element, 'releaseTime'),
+        )
+
+
+@dataclass
+class SubscriptionEvent:
+    event_id: str
+    sequence_number: Optional[int]
+    event_type: str
+    subscription_id: Optional[str] = None
+    user_id: Optional[str] = None
+    target_id: Optional[str] = None
+    external_application_id: Optional[str] = None
+    call: Optional[Call] = None
+
+    @classmethod
+    def from_xml(cls, element: ElementTree.Element) -> 'SubscriptionEvent':
+        event_data = element.find(f'{_XSI}eventData')
+        call = event_data.find(f'{_XSI}call') if event_data is not None else None
+        sequence_number = _text(element, 'sequenceNumber')
+        return cls(
+            _text(element, 'eventID'),  # type: ignore
+            int(sequence_number) if sequence_number else None,
+            _local_type(event_data if event_data is not None else element),
+            _text(element, 'subscriptionId'),
+            _text(element, 'userId'),
+            _text(element, 'targetId'),
+            _text(element, 'externalApplicationId'),
+            Call.from_xml(call) if call is not None else None,
+        )
+
+
+def parse_event(body: bytes) -> SubscriptionEvent:
+    """Parse an XSI event document, raise ``ValueError`` if it is not one."""
+    try:
+        root = ElementTree.fromstring(body)
+    except ElementTree.ParseError as e:
+        raise ValueError(f'Invalid event XML: {e}') from e
+    if root.tag != f'{_XSI}Event':
+        raise ValueError(f'Unexpected event element {root.tag}')
+    return SubscriptionEvent.from_xml(root)
@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List
+
+from .client import BeelinePBX
+from .models import IcrRouteRule, IcrRouteResult
+
+
+@dataclass
+class IcrRouteDiff:
+    to_add: List[IcrRouteRule] = field(default_factory=list)
+    to_update: List[IcrRouteRule] = field(default_factory=list)
+    to_delete: List[IcrRouteRule] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.to_add or self.to_update or self.to_delete)
+
+
+def diff_icr_route_rules(
+    current: Iterable[IcrRouteRule],
+    desired: Iterable[IcrRouteRule],
+    delete_missing: bool = True,
+) -> IcrRouteDiff:
+    """Compare rules by ``inbound_number``; the last desired rule for a number wins."""
+    current_rules = {rule.inbound_number: rule for rule in current}
+    desired_rules = {rule.inbound_number: rule for rule in desired}
+    diff = IcrRouteDiff()
+    for number, rule in desired_rules.items():
+        existing = current_rules.get(number)
+        if existing is None:
+            diff.to_add.append(rule)
+        elif existing.extension != rule.extension:
+            diff.to_update.append(rule)
+    if delete_missing:
+        diff.to_delete = [
+            rule for number, rule in current_rules.items() if number not in desired_rules
+        ]
+    return diff
+
+
+def _apply_in_chunks(
+    operation: Callable[[List[IcrRouteRule]], map],
+    rules: List[IcrRouteRule],
+    chunk_size: int,
+) -> List[IcrRouteResult]:
+    results: List[IcrRouteResult] = []
+    for i in range(0, len(rules), chunk_size):
+        results.extend(operation(rules[i:i + chunk_size]))
+    return results
+
+
+def sync_icr_route_rules(
+    client: BeelinePBX,
+    desired: Iterable[IcrRouteRule],
+    chunk_size: int = 100,
+    delete_missing: bool = True,
+) -> List[IcrRouteResult]:
+    """Make the portal ICR route rules match ``desired`` with minimal changes.
+
+    Only added, changed and (with ``delete_missing``) removed rules are
+    sent, ``chunk_size`` rules per request. Results of every batch are
+    returned in add, update, delete order.
+    """
+    diff = diff_icr_route_rules(client.get_icr_route_rules(), desired, delete_missing)
+    return (
+        _apply_in_chunks(client.add_list_of_icr_rules, diff.to_add, chunk_size)
+        + _apply_in_chunks(client.update_list_of_icr_rules, diff.to_update, chunk_size)
+        + _apply_in_chunks(client.delete_list_of_icr_rules, diff.to_delete, chunk_size)
+    )
@@ -0,0 +1,60 @@
+"""Sharing of repeated values between models decoded in one fetch.
+
+Inside ``with decode_context():`` every ``from_beeline_struct`` call reuses
+one ``Abonent`` per ``user_id`` and one instance of each repeated string
+(``direction``, ``status``, ``department``) instead of building new ones
+for every record. Shared abonents are the same object in many records and
+must not be mutated. Outside of a context models are decoded as usual.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Type, TypeVar
+
+T = TypeVar('T')
+
+
+class DecodeContext(object):
+    __slots__ = ('objects', 'strings')
+
+    def __init__(self):
+        self.objects: Dict[tuple, Any] = {}
+        self.strings: Dict[str, str] = {}
+
+
+_decode_context: ContextVar[Optional[DecodeContext]] = ContextVar(
+    'beeline_decode_context', default=None
+)
+
+
+@contextmanager
+def decode_context() -> Iterator[DecodeContext]:
+    context = DecodeContext()
+    token = _decode_context.set(context)
+    try:
+        yield context
+    finally:
+        _decode_context.reset(token)
+
+
+def current_decode_context() -> Optional[DecodeContext]:
+    return _decode_context.get()
+
+
+def intern_string(value: Optional[str]) -> Optional[str]:
+    context = _decode_context.get()
+    if context is None or value is None:
+        return value
+    return context.strings.setdefault(value, value)
+
+
+def decode_shared(cls: Type[T], beeline_struct: dict, key: str = 'userId') -> T:
+    context = _decode_context.get()
+    if context is None:
+        return cls.from_beeline_struct(beeline_struct)  # type: ignore
+    cache_key = (cls, beeline_struct[key])
+    model = context.objects.get(cache_key)
+    if model is None:
+        model = context.objects.setdefault(
+            cache_key, cls.from_beeline_struct(beeline_struct)  # type: ignore
+        )
+    return model
@@ -0,0 +1,126 @@
+"""Incremental parsing of JSON arrays from a chunked response body.
+
+Only the structure of the document is scanned; every array item is cut out
+as a byte slice and decoded on its own, so memory is bounded by the size of
+one item plus one chunk rather than by the whole body.
+"""
+import json
+import re
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+
+_STRUCTURAL = re.compile(rb'["\[\]{},:]')
+_STRING_END = re.compile(rb'["\\]')
+
+_QUOTE, _COMMA, _COLON = ord('"'), ord(','), ord(':')
+_OPEN = (ord('['), ord('{'))
+_CLOSE = (ord(']'), ord('}'))
+
+
+class JsonArrayParser(object):
+    """Yield the raw items of one array of a JSON document fed in chunks.
+
+    The array is the document itself when ``key`` is ``None``, otherwise
+    the value of ``key`` in the top-level object.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key.encode() if key is not None else None
+        self.done = False
+        self._buf = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._string_start = 0
+        self._last_string: Optional[bytes] = None
+        self._current_key: Optional[bytes] = None
+        self._array_depth: Optional[int] = None
+        self._item_start = 0
+
+    def _is_target(self) -> bool:
+        if self.key is None:
+            return self._depth == 0
+        return self._depth == 1 and self._current_key == self.key
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        if self.done:
+            return []
+        buf = self._buf
+        buf += chunk
+        items: List[bytes] = []
+        while not self.done:
+            if self._in_string:
+                m = _STRING_END.search(buf, self._pos)
+                if m is None:
+                    self._pos = len(buf)
+                    break
+                if buf[m.start()] == _QUOTE:
+                    self._in_string = False
+                    self._pos = m.end()
+                    self._last_string = bytes(buf[self._string_start:m.start()])
+                elif m.end() < len(buf):
+                    self._pos = m.end() + 1
+                else:
+                    # escape sequence is split between chunks
+                    self._pos = m.start()
+                    break
+                continue
+            m = _STRUCTURAL.search(buf, self._pos)
+            if m is None:
+                self._pos = len(buf)
+                break
+            char, i = buf[m.start()], m.start()
+            self._pos = m.end()
+            if char == _QUOTE:
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in _OPEN:
+                if self._array_depth is None and char == _OPEN[0] and self._is_target():
+                    self._array_depth = self._depth + 1
+                    self._item_start = self._pos
+                self._depth += 1
+            elif char in _CLOSE:
+                if self._depth == self._array_depth:
+                    self._add_item(items, i)
+                    self.done = True
+                self._depth -= 1
+            elif char == _COMMA:
+                if self._depth == self._array_depth:
+                    self._add_item(items, i)
+                    self._item_start = self._pos
+                elif self._depth == 1:
+                    self._current_key = None
+            elif char == _COLON and self._depth == 1:
+                self._current_key = self._last_string
+        self._compact()
+        return items
+
+    def _add_item(self, items: List[bytes], end: int) -> None:
+        item = bytes(self._buf[self._item_start:end]).strip()
+        if item:
+            items.append(item)
+
+    def _compact(self) -> None:
+        keep = self._pos
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if self._array_depth is not None and not self.done:
+            keep = min(keep, self._item_start)
+        if keep:
+            del self._buf[:keep]
+            self._pos -= keep
+            self._string_start -= keep
+            self._item_start -= keep
+
+
+def iter_json_array(
+    chunks: Iterable[bytes],
+    key: Optional[str] = None,
+    loads: Callable[[bytes], Any] = json.loads,
+) -> Iterator[Any]:
+    parser = JsonArrayParser(key)
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield loads(item)
+        if parser.done:
+            return
@@ -0,0 +1,132 @@
+"""Models that keep the raw response dict and decode fields on first access.
+
+Pipelines that only look at a few cheap fields (``direction``,
+``duration``) never pay for datetime parsing or nested model building.
+Decoded values are cached on the instance, so every field is decoded at
+most once. ``to_beeline_struct`` and ``to_model`` return the same data as
+the eager models in ``models``.
+"""
+from functools import partial
+from typing import Any, Callable, Optional
+
+from .interning import decode_shared, intern_string
+from .models import (
+    Abonent,
+    BaseModel,
+    CallRecord,
+    StatRecordV2,
+    VoiceCampaignAnswer,
+    VoiceCampaignInfoNumber,
+    VoiceCampaignInfoReport,
+)
+from .utils import parse_datetime, parse_datetime_from_milliseconds
+
+
+class LazyField(object):
+    def __init__(
+        self,
+        key: str,
+        decode: Optional[Callable[[Any], Any]] = None,
+        required: bool = True,
+    ):
+        self.key = key
+        self.decode = decode
+        self.required = required
+        self.name = key
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Optional['LazyModel'], owner: type) -> Any:
+        if instance is None:
+            return self
+        struct = instance.beeline_struct
+        if self.required:
+            value = struct[self.key]
+            if self.decode is not None:
+                value = self.decode(value)
+        else:
+            value = struct.get(self.key)
+            if self.decode is not None:
+                value = self.decode(value) if value is not None else None
+        # cache in the instance dict, which takes precedence over this descriptor
+        instance.__dict__[self.name] = value
+        return value
+
+
+def _list_of(model: type) -> Callable[[list], list]:
+    return lambda items: [model.from_beeline_struct(item) for item in items]
+
+
+class LazyModel(BaseModel):
+    model: type = BaseModel
+
+    def __init__(self, beeline_struct: dict):
+        self.beeline_struct = beeline_struct
+
+    @classmethod
+    def from_beeline_struct(cls, beeline_struct: dict) -> 'LazyModel':
+        return cls(beeline_struct)
+
+    def to_model(self) -> BaseModel:
+        return self.model.from_beeline_struct(self.beeline_struct)
+
+    def to_beeline_struct(self) -> dict:
+        return self.model.to_beeline_struct(self)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.beeline_struct == other.beeline_struct  # type: ignore
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.beeline_struct!r})'
+
+
+class LazyCallRecord(LazyModel):
+    model = CallRecord
+
+    id_ = LazyField('id')
+    external_id = LazyField('externalId')
+    phone = LazyField('phone')
+    direction = LazyField('direction', intern_string)
+    date = LazyField('date', parse_datetime_from_milliseconds)
+    duration = LazyField('duration')
+    file_size = LazyField('fileSize')
+    abonent = LazyField('abonent', partial(decode_shared, Abonent))
+    comment = LazyField('comment', required=False)
+
+
+class LazyStatRecordV2(LazyModel):
+    model = StatRecordV2
+
+    start_date = LazyField('startDate', parse_datetime_from_milliseconds)
+    abonent = LazyField('abonent', partial(decode_shared, Abonent))
+    direction = LazyField('direction', intern_string)
+    status = LazyField('status', intern_string)
+    duration = LazyField('duration')
+    phone_to = LazyField('phone_to', required=False)
+    phone_from = LazyField('phone_from', required=False)
+    department = LazyField('department', intern_string, required=False)
+    call_forward = LazyField('callForward', required=False)
+
+
+class LazyVoiceCampaignInfoReport(LazyModel):
+    model = VoiceCampaignInfoReport
+
+    campaign_name = LazyField('campaignName')
+    report_date = LazyField('reportDate', parse_datetime)
+    client = LazyField('client')
+    state = LazyField('state')
+    start_date = LazyField('startDate', parse_datetime)
+    finish_date = LazyField('finishDate', parse_datetime)
+    total = LazyField('total')
+    processed = LazyField('processed')
+    success = LazyField('success')
+    abandoned = LazyField('abandoned')
+    busy_or_no_answer = LazyField('busyOrNoAnswer')
+    number_list = LazyField('numberList', _list_of(VoiceCampaignInfoNumber))
+    abonent = LazyField('abonent', partial(decode_shared, Abonent), required=False)
+    answer_list = LazyField(
+        'answerList', _list_of(VoiceCampaignAnswer), required=False
+    )
@@ -0,0 +1,126 @@
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class RequestInfo:
+    endpoint: str
+    http_method: str
+    status_code: Optional[int]
+    bytes_sent: int
+    bytes_received: int
+    elapsed: float
+    retries: int
+
+    @property
+    def is_error(self) -> bool:
+        return self.status_code is None or self.status_code >= 400
+
+
+class RequestObserver(object):
+    """Receives a callback before and after every HTTP request of a client.
+
+    ``endpoint`` is the endpoint template, e.g. ``abonents/{pattern}/agent``.
+    ``on_request_end`` is called once per request, after all retries, also
+    when the request failed with a connection error (``status_code`` is
+    ``None`` then).
+    """
+
+    def on_request_start(self, http_method: str, endpoint: str) -> None:
+        pass
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        pass
+
+
+class LatencyHistogram(object):
+    """Histogram with logarithmic buckets.
+
+    Every bucket is ``growth`` times wider than the previous one, so
+    percentiles are reported within ``(growth - 1) / 2`` relative error
+    using constant memory per endpoint.
+    """
+
+    def __init__(self, growth: float = 1.1, min_value: float = 1e-4):
+        self.growth = growth
+        self.min_value = min_value
+        self._log_growth = math.log(growth)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        bucket = (
+            int(math.log(value / self.min_value) / self._log_growth)
+            if value > self.min_value
+            else 0
+        )
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # middle of the bucket, never above the largest recorded value
+                value = self.min_value * self.growth ** (bucket + 0.5)
+                return min(value, self.max)
+        return self.max
+
+
+class InMemoryMetrics(RequestObserver):
+    """Latency histograms, error and traffic counters per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        key = (info.http_method.upper(), info.endpoint)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+                self._counters[key] = {
+                    'errors': 0,
+                    'retries': 0,
+                    'bytes_sent': 0,
+                    'bytes_received': 0,
+                }
+            histogram.record(info.elapsed)
+            counters = self._counters[key]
+            counters['errors'] += info.is_error
+            counters['retries'] += info.retries
+            counters['bytes_sent'] += info.bytes_sent
+            counters['bytes_received'] += info.bytes_received
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Return ``{'GET abonents/{pattern}': {'count': ..., 'p50': ..., ...}}``."""
+        with self._lock:
+            return {
+                f'{method} {endpoint}': {
+                    'count': histogram.count,
+                    'p50': histogram.percentile(50),
+                    'p95': histogram.percentile(95),
+                    'p99': histogram.percentile(99),
+                    'max': histogram.max,
+                    'mean': histogram.total / histogram.count,
+                    **self._counters[(method, endpoint)],
+                }
+                for (method, endpoint), histogram in self._histograms.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
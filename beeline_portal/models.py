@@ -1,8 +1,9 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import ClassVar, List, Optional, Type
 from abc import ABC
 from dataclasses import dataclass
 
+from .interning import decode_shared, intern_string
 from .utils import (
     parse_datetime_from_milliseconds,
     parse_datetime,
@@ -12,6 +13,8 @@ from .utils import (
 
 
 class BaseModel(ABC):
+    __slots__ = ()
+
     @classmethod
     def from_beeline_struct(cls, beeline_struct: dict) -> 'BaseModel':
         raise NotImplementedError()
@@ -39,7 +42,7 @@ class Abonent(BaseModel):
             beeline_struct.get('phone'),
             beeline_struct.get('extension'),
             beeline_struct.get('email'),
-            beeline_struct.get('department'),
+            intern_string(beeline_struct.get('department')),
         )
 
     def to_beeline_struct(self) -> dict:
@@ -379,7 +382,7 @@ class VoiceCampaignInfoReport(BaseModel):
                 VoiceCampaignInfoNumber.from_beeline_struct(n)
                 for n in beeline_struct['numberList']
             ],
-            Abonent.from_beeline_struct(beeline_struct['abonent'])
+            decode_shared(Abonent, beeline_struct['abonent'])
             if beeline_struct.get('abonent')
             else None,
             [
@@ -423,16 +426,19 @@ class StatRecord(BaseModel):
     department: Optional[str] = None
     call_forward: Optional[str] = None
 
+    # nested model of ``abonent``, the compact variants use CompactAbonent
+    abonent_model: ClassVar[Type[Abonent]] = Abonent
+
     @classmethod
     def from_beeline_struct(cls, beeline_struct: dict) -> 'StatRecord':
         return cls(
             parse_datetime_from_milliseconds(beeline_struct['startDate']),
-            Abonent.from_beeline_struct(beeline_struct['abonent']),
-            beeline_struct['direction'],
-            beeline_struct['status'],
+            decode_shared(cls.abonent_model, beeline_struct['abonent']),
+            intern_string(beeline_struct['direction']),
+            intern_string(beeline_struct['status']),
             beeline_struct['phone'],
             beeline_struct['duration'],
-            beeline_struct.get('department'),
+            intern_string(beeline_struct.get('department')),
             beeline_struct.get('callForward'),
         )
 
@@ -464,17 +470,20 @@ class StatRecordV2(BaseModel):
     department: Optional[str] = None
     call_forward: Optional[str] = None
 
+    # nested model of ``abonent``, the compact variants use CompactAbonent
+    abonent_model: ClassVar[Type[Abonent]] = Abonent
+
     @classmethod
     def from_beeline_struct(cls, beeline_struct: dict) -> 'StatRecordV2':
         return cls(
             parse_datetime_from_milliseconds(beeline_struct['startDate']),
-            Abonent.from_beeline_struct(beeline_struct['abonent']),
-            beeline_struct['direction'],
-            beeline_struct['status'],
+            decode_shared(cls.abonent_model, beeline_struct['abonent']),
+            intern_string(beeline_struct['direction']),
+            intern_string(beeline_struct['status']),
             beeline_struct['duration'],
             beeline_struct.get('phone_to'),
             beeline_struct.get('phone_from'),
-            beeline_struct.get('department'),
+            intern_string(beeline_struct.get('department')),
             beeline_struct.get('callForward'),
         )
 
@@ -649,17 +658,20 @@ class CallRecord(BaseModel):
     abonent: Abonent
     comment: Optional[str] = None
 
+    # nested model of ``abonent``, the compact variants use CompactAbonent
+    abonent_model: ClassVar[Type[Abonent]] = Abonent
+
     @classmethod
     def from_beeline_struct(cls, beeline_struct: dict) -> 'CallRecord':
         return cls(
             beeline_struct['id'],
             beeline_struct['externalId'],
             beeline_struct['phone'],
-            beeline_struct['direction'],
+            intern_string(beeline_struct['direction']),
             parse_datetime_from_milliseconds(beeline_struct['date']),
             beeline_struct['duration'],
             beeline_struct['fileSize'],
-            Abonent.from_beeline_struct(beeline_struct['abonent']),
+            decode_shared(cls.abonent_model, beeline_struct['abonent']),
             beeline_struct.get('comment'),
         )
 
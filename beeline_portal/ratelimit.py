@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import contextmanager, asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    MutableMapping,
+)
+
+
+class RateLimiter(object):
+    """Token bucket limiter for requests sent with one access token.
+
+    At most ``rate`` requests per second are started, with bursts up to
+    ``burst`` requests, and at most ``max_concurrency`` are in flight at
+    once. Callers that exceed the rate wait for their reserved slot, so
+    the request flow stays smooth instead of bursting into 429 errors.
+
+    A request is in flight until its slot is released, for responses with
+    a streamed body that is when the response is closed (see
+    ``release_on_close``). One instance may be shared by any number of
+    clients (sync and async) in a process, see ``shared_rate_limiter``. The
+    in-flight limit of async callers is kept per event loop.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self.max_concurrency = max_concurrency
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._semaphore = (
+            threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        )
+        self._async_semaphores: MutableMapping[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long to wait until it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def _async_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if not self.max_concurrency:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._async_semaphores[loop] = semaphore
+            return semaphore
+
+    @staticmethod
+    def _releaser(semaphore: Any) -> Callable[[], None]:
+        released = []
+
+        def release() -> None:
+            # responses may be closed more than once
+            if semaphore is not None and not released:
+                released.append(True)
+                semaphore.release()
+
+        return release
+
+    def acquire(self) -> Callable[[], None]:
+        """Wait for a request slot, return the function that releases it."""
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        release = self._releaser(self._semaphore)
+        try:
+            delay = self._reserve()
+            if delay:
+                time.sleep(delay)
+        except BaseException:
+            release()
+            raise
+        return release
+
+    async def async_acquire(self) -> Callable[[], None]:
+        semaphore = self._async_semaphore()
+        if semaphore is not None:
+            await semaphore.acquire()
+        release = self._releaser(semaphore)
+        try:
+            delay = self._reserve()
+            if delay:
+                await asyncio.sleep(delay)
+        except BaseException:
+            release()
+            raise
+        return release
+
+    @contextmanager
+    def limit(self) -> Iterator[None]:
+        release = self.acquire()
+        try:
+            yield
+        finally:
+            release()
+
+    @asynccontextmanager
+    async def async_limit(self) -> AsyncIterator[None]:
+        release = await self.async_acquire()
+        try:
+            yield
+        finally:
+            release()
+
+
+def _releasing(close: Callable, release: Callable[[], None]) -> Callable:
+    def closing(*args, **kwargs):
+        try:
+            return close(*args, **kwargs)
+        finally:
+            release()
+
+    return closing
+
+
+def release_on_close(response: Any, release: Callable[[], None], *methods: str) -> None:
+    """Call ``release`` once any of the ``methods`` of ``response`` is called."""
+    for name in methods:
+        setattr(response, name, _releasing(getattr(response, name), release))
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter(
+    access_token: str,
+    rate: float,
+    burst: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+) -> RateLimiter:
+    """Return the process-wide limiter for ``access_token``, creating it once.
+
+    Raise ``ValueError`` if it exists with other limits.
+    """
+    requested = RateLimiter(rate, burst, max_concurrency)
+    with _shared_lock:
+        limiter = _shared_limiters.setdefault(access_token, requested)
+    if (limiter.rate, limiter.burst, limiter.max_concurrency) != (
+        requested.rate,
+        requested.burst,
+        requested.max_concurrency,
+    ):
+        raise ValueError(
+            f'The shared limiter of this access token has rate={limiter.rate}, '
+            f'burst={limiter.burst}, max_concurrency={limiter.max_concurrency}'
+        )
+    return limiter
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Optional
+
+RECORDING_ON = 'ON'
+RECORDING_OFF = 'OFF'
+
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+
+@dataclass
+class RecordingChange:
+    pattern: str
+    previous_status: Optional[str]
+    status: str
+
+
+def recording_status(enable: bool) -> str:
+    return RECORDING_ON if enable else RECORDING_OFF
@@ -0,0 +1,175 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .client import BeelinePBX
+from .cursors import CursorStore
+from .errors import BeelinePBXException
+from .models import CallRecord
+from .utils import format_datetime, parse_datetime_from_milliseconds, to_milliseconds
+
+
+MANIFEST_NAME = 'manifest.json'
+
+
+@dataclass
+class ArchivedRecord:
+    id_: str
+    external_id: str
+    user_id: str
+    file_name: str
+    file_size: int
+    duration: int
+    status: str
+    error: Optional[str] = None
+
+
+def record_file_name(record: CallRecord, name_template: str) -> str:
+    return name_template.format(id_=record.id_, external_id=record.external_id)
+
+
+def _archive_record(
+    client: BeelinePBX,
+    record: CallRecord,
+    target_dir: str,
+    name_template: str,
+    chunk_size: int,
+) -> ArchivedRecord:
+    file_name = record_file_name(record, name_template)
+    path = os.path.join(target_dir, file_name)
+    entry = ArchivedRecord(
+        record.id_,
+        record.external_id,
+        record.abonent.user_id,
+        file_name,
+        record.file_size,
+        record.duration,
+        'skipped',
+    )
+    if os.path.exists(path) and os.path.getsize(path) == record.file_size:
+        return entry
+    part_path = f'{path}.part'
+    try:
+        client.download_record_to(
+            record.id_,
+            part_path,
+            chunk_size,
+            resume=True,
+            expected_size=record.file_size,
+        )
+    except BeelinePBXException as e:
+        entry.status = 'failed'
+        entry.error = e.description
+        return entry
+    os.replace(part_path, path)
+    entry.status = 'downloaded'
+    return entry
+
+
+def _write_manifest(target_dir: str, entries: List[ArchivedRecord]) -> None:
+    path = os.path.join(target_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = {e['id_']: e for e in json.load(f)}
+    for entry in entries:
+        if entry.status == 'failed' and entry.id_ in manifest:
+            continue
+        manifest[entry.id_] = asdict(entry)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(list(manifest.values()), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def archive_records(
+    client: BeelinePBX,
+    target_dir: str,
+    params: Optional[dict] = None,
+    max_workers: int = 4,
+    name_template: str = '{id_}.mp3',
+    chunk_size: int = 64 * 1024,
+) -> List[ArchivedRecord]:
+    """Download every record matching ``params`` into ``target_dir``.
+
+    Records are downloaded by a pool of ``max_workers`` threads and named
+    by ``name_template`` (``{id_}`` and ``{external_id}`` are available).
+    Files that already exist with the record ``file_size`` are skipped and
+    interrupted downloads are resumed, so the archive can be re-run. The
+    result of every record is returned and merged into ``manifest.json`` in
+    ``target_dir``.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    records = list(client.get_records(params))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        entries = list(
+            executor.map(
+                lambda record: _archive_record(
+                    client, record, target_dir, name_template, chunk_size
+                ),
+                records,
+            )
+        )
+    _write_manifest(target_dir, entries)
+    return entries
+
+
+def sync_records(
+    client: BeelinePBX,
+    cursor_store: CursorStore,
+    since: Optional[datetime] = None,
+    params: Optional[dict] = None,
+    name: str = 'records',
+    overlap: timedelta = timedelta(hours=1),
+    compact: bool = False,
+) -> List[CallRecord]:
+    """Return call records added since the previous sync, oldest first.
+
+    The first sync (no cursor saved under ``name``) requests records from
+    ``since``, later ones from the newest seen record ``date`` minus
+    ``overlap``. Records returned by a previous sync are dropped by ``id_``,
+    records older than the requested window are dropped as well.
+    The cursor is saved before returning, so every record is returned once.
+    """
+    cursor = cursor_store.load(name) or {}
+    seen: Dict[str, int] = cursor.get('seen', {})
+    date_from = since
+    if 'date' in cursor:
+        # compared as epoch milliseconds, since may be naive or aware
+        resume_from = cursor['date'] - overlap // timedelta(milliseconds=1)
+        if since is None or to_milliseconds(since) < resume_from:
+            date_from = parse_datetime_from_milliseconds(
+                resume_from, utc=since is not None and since.tzinfo is not None
+            )
+    request_params = dict(params or {})
+    window_start = 0
+    if date_from is not None:
+        request_params['dateFrom'] = format_datetime(date_from)
+        window_start = to_milliseconds(date_from)
+
+    new_records: Dict[str, CallRecord] = {}
+    for record in client.get_records(request_params, compact):
+        if record.id_ in seen or to_milliseconds(record.date) < window_start:
+            continue
+        new_records[record.id_] = record
+    records = sorted(new_records.values(), key=lambda r: (r.date, r.id_))
+    if not records:
+        return records
+
+    for record in records:
+        seen[record.id_] = to_milliseconds(record.date)
+    newest = max(cursor.get('date', 0), seen[records[-1].id_])
+    # ids older than the next request window can not be returned again
+    oldest = newest - overlap // timedelta(milliseconds=1)
+    cursor_store.save(
+        name,
+        {
+            'date': newest,
+            'id': records[-1].id_,
+            'seen': {id_: date for id_, date in seen.items() if date >= oldest},
+        },
+    )
+    return records
@@ -0,0 +1,88 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+
+IDEMPOTENT_METHODS = frozenset({'get', 'head', 'options', 'put', 'delete'})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header, either delay-seconds or an HTTP-date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to wait before re-sending a failed request.
+
+    Connection errors and ``retry_statuses`` responses are retried for
+    idempotent requests only (``idempotent_methods`` unless the caller says
+    otherwise); 429 is retried for every request because it was rejected
+    before processing. The delay grows as ``backoff_factor * 2 ** (attempt
+    - 1)`` capped by ``max_backoff`` with full jitter. A ``Retry-After`` sent
+    by the server is waited in full, or the request is given up when it is
+    longer than ``max_backoff``.
+    """
+
+    max_attempts: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    jitter: bool = True
+    retry_statuses: FrozenSet[int] = RETRY_STATUSES
+    idempotent_methods: FrozenSet[str] = IDEMPOTENT_METHODS
+
+    def should_retry(
+        self,
+        attempt: int,
+        http_method: str,
+        status_code: Optional[int] = None,
+        idempotent: Optional[bool] = None,
+    ) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        if status_code == 429:
+            return True
+        if idempotent is None:
+            idempotent = http_method.lower() in self.idempotent_methods
+        if not idempotent:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        delay = parse_retry_after(retry_after)
+        if delay is not None:
+            return delay
+        delay = min(self.backoff_factor * 2 ** (attempt - 1), self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def retry_delay(
+        self,
+        attempt: int,
+        http_method: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None,
+        idempotent: Optional[bool] = None,
+    ) -> Optional[float]:
+        """Seconds to wait before the next attempt, ``None`` to stop retrying."""
+        if not self.should_retry(attempt, http_method, status_code, idempotent):
+            return None
+        delay = self.backoff(attempt, retry_after)
+        return delay if delay <= self.max_backoff else None
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
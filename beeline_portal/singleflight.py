@@ -0,0 +1,67 @@
+"""Deduplication of identical concurrent calls.
+
+While a call for a key is in flight, every other caller with the same key
+waits for it and receives the same result (or exception) instead of
+starting its own call. Results are shared objects and must not be mutated
+by callers.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight(object):
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # mark the exception retrieved when every caller was cancelled
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # the call runs in its own task and every caller waits on it shielded,
+        # so cancelling one caller (the first one included) leaves it running
+        # for the others
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
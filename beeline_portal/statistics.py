@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timedelta
+from heapq import merge
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .client import BeelinePBX
+from .models import StatRecordV2
+
+
+def split_date_range(
+    date_from: datetime,
+    date_to: datetime,
+    window: Optional[timedelta] = None,
+    shards: Optional[int] = None,
+) -> List[Tuple[datetime, datetime]]:
+    """Split ``date_from``-``date_to`` into contiguous sub-windows.
+
+    Either a fixed ``window`` (e.g. ``timedelta(hours=1)``) or a number of
+    equally sized ``shards`` must be given.
+    """
+    if date_to <= date_from:
+        return []
+    if window is None:
+        if not shards:
+            raise ValueError('window or shards is required')
+        window = (date_to - date_from) / shards
+    if window <= timedelta(0):
+        raise ValueError('window must be positive')
+    windows = []
+    start = date_from
+    while start < date_to:
+        end = min(start + window, date_to)
+        windows.append((start, end))
+        start = end
+    return windows
+
+
+def _stat_record_key(record: StatRecordV2) -> tuple:
+    return (
+        record.abonent.user_id,
+        record.start_date,
+        record.direction,
+        record.status,
+        record.duration,
+        record.phone_from,
+        record.phone_to,
+        record.call_forward,
+    )
+
+
+def _fetch_window(
+    client: BeelinePBX,
+    user_id: str,
+    date_from: datetime,
+    date_to: datetime,
+    page_size: int,
+    compact: bool,
+) -> List[StatRecordV2]:
+    records: List[StatRecordV2] = []
+    page = 0
+    while True:
+        chunk = list(
+            client.get_v2_statistic(
+                user_id, date_from, date_to, page, page_size, compact
+            )
+        )
+        records.extend(chunk)
+        if len(chunk) < page_size:
+            break
+        page += 1
+    records.sort(key=lambda r: r.start_date)
+    return records
+
+
+def fetch_v2_statistic(
+    client: BeelinePBX,
+    user_ids: Union[str, Iterable[str]],
+    date_from: datetime,
+    date_to: datetime,
+    window: Optional[timedelta] = timedelta(days=1),
+    shards: Optional[int] = None,
+    max_workers: int = 8,
+    page_size: int = 100,
+    compact: bool = False,
+) -> List[StatRecordV2]:
+    """Fetch v2 statistic for a long date range in parallel.
+
+    The range is split into sub-windows (see ``split_date_range``); every
+    (user_id, window) pair is fetched concurrently with up to ``max_workers``
+    threads and the results are merged in ``start_date`` order. Records
+    returned by two adjacent windows are kept once.
+    """
+    if isinstance(user_ids, str):
+        user_ids = [user_ids]
+    if shards:
+        window = None
+    windows = split_date_range(date_from, date_to, window, shards)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                copy_context().run,
+                _fetch_window,
+                client,
+                user_id,
+                start,
+                end,
+                page_size,
+                compact,
+            )
+            for user_id in user_ids
+            for start, end in windows
+        ]
+        results = [future.result() for future in futures]
+
+    records: List[StatRecordV2] = []
+    seen = set()
+    for record in merge(*results, key=lambda r: r.start_date):
+        key = _stat_record_key(record)
+        if key in seen:
+            continue
+        seen.add(key)
+        records.append(record)
+    return records
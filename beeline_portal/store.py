@@ -0,0 +1,328 @@
+"""Local SQLite copy of v2 statistic and call records.
+
+``StatisticStore.sync_v2_statistic`` and ``sync_call_records`` fetch only
+what is newer than the per-abonent high-water mark of the previous sync
+(minus ``overlap``, for calls that show up late) and insert it, rows that
+are already stored are skipped. The stored data is then queried locally
+with ``query_v2_statistic`` and ``query_call_records``.
+"""
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Union
+
+from .client import BeelinePBX
+from .models import Abonent, CallRecord, StatRecordV2
+from .utils import format_datetime, parse_datetime_from_milliseconds, to_milliseconds
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS abonents (
+    user_id TEXT PRIMARY KEY,
+    last_name TEXT,
+    first_name TEXT,
+    phone TEXT,
+    extension TEXT,
+    email TEXT,
+    department TEXT
+);
+CREATE TABLE IF NOT EXISTS v2_statistic (
+    start_date INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    phone_to TEXT,
+    phone_from TEXT,
+    department TEXT,
+    call_forward TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS v2_statistic_key ON v2_statistic (
+    user_id, start_date, direction, status, duration,
+    IFNULL(phone_from, ''), IFNULL(phone_to, ''), IFNULL(call_forward, '')
+);
+CREATE INDEX IF NOT EXISTS v2_statistic_start_date ON v2_statistic (start_date);
+CREATE INDEX IF NOT EXISTS v2_statistic_direction ON v2_statistic (direction);
+CREATE INDEX IF NOT EXISTS v2_statistic_status ON v2_statistic (status);
+CREATE TABLE IF NOT EXISTS call_records (
+    id TEXT PRIMARY KEY,
+    external_id TEXT,
+    user_id TEXT NOT NULL,
+    phone TEXT,
+    direction TEXT,
+    date INTEGER NOT NULL,
+    duration INTEGER,
+    file_size INTEGER,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS call_records_user_id ON call_records (user_id, date);
+CREATE INDEX IF NOT EXISTS call_records_date ON call_records (date);
+CREATE INDEX IF NOT EXISTS call_records_direction ON call_records (direction);
+CREATE TABLE IF NOT EXISTS high_water_marks (
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (kind, user_id)
+);
+'''
+
+V2_STATISTIC = 'v2_statistic'
+CALL_RECORDS = 'call_records'
+
+
+class StatisticStore(object):
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'StatisticStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _high_water_mark(self, kind: str, user_id: str) -> Optional[int]:
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT value FROM high_water_marks WHERE kind = ? AND user_id = ?',
+                (kind, user_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def high_water_mark(self, kind: str, user_id: str) -> Optional[datetime]:
+        high_water_mark = self._high_water_mark(kind, user_id)
+        if high_water_mark is None:
+            return None
+        return parse_datetime_from_milliseconds(high_water_mark)
+
+    def _sync_from(
+        self, kind: str, user_id: str, date_from: datetime, overlap: timedelta
+    ) -> datetime:
+        high_water_mark = self._high_water_mark(kind, user_id)
+        if high_water_mark is None:
+            return date_from
+        # compared as epoch milliseconds, date_from may be naive or aware
+        resume_from = high_water_mark - overlap // timedelta(milliseconds=1)
+        if to_milliseconds(date_from) >= resume_from:
+            return date_from
+        return parse_datetime_from_milliseconds(
+            resume_from, utc=date_from.tzinfo is not None
+        )
+
+    def _save_abonent(self, abonent: Abonent) -> None:
+        self.connection.execute(
+            'INSERT OR REPLACE INTO abonents VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                abonent.user_id,
+                abonent.last_name,
+                abonent.first_name,
+                abonent.phone,
+                abonent.extension,
+                abonent.email,
+                abonent.department,
+            ),
+        )
+
+    def _save_high_water_mark(self, kind: str, user_id: str, value: datetime):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO high_water_marks VALUES (?, ?, ?)',
+            (kind, user_id, to_milliseconds(value)),
+        )
+
+    def add_v2_statistic(self, records: Iterable[StatRecordV2]) -> int:
+        """Insert records that are not stored yet, return the inserted count."""
+        inserted = 0
+        with self._lock, self.connection:
+            abonents = set()
+            for record in records:
+                if record.abonent.user_id not in abonents:
+                    abonents.add(record.abonent.user_id)
+                    self._save_abonent(record.abonent)
+                inserted += self.connection.execute(
+                    'INSERT OR IGNORE INTO v2_statistic '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        to_milliseconds(record.start_date),
+                        record.abonent.user_id,
+                        record.direction,
+                        record.status,
+                        record.duration,
+                        record.phone_to,
+                        record.phone_from,
+                        record.department,
+                        record.call_forward,
+                    ),
+                ).rowcount
+        return inserted
+
+    def add_call_records(self, records: Iterable[CallRecord]) -> int:
+        """Insert records that are not stored yet, return the inserted count."""
+        inserted = 0
+        with self._lock, self.connection:
+            abonents = set()
+            for record in records:
+                if record.abonent.user_id not in abonents:
+                    abonents.add(record.abonent.user_id)
+                    self._save_abonent(record.abonent)
+                inserted += self.connection.execute(
+                    'INSERT OR IGNORE INTO call_records '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        record.id_,
+                        record.external_id,
+                        record.abonent.user_id,
+                        record.phone,
+                        record.direction,
+                        to_milliseconds(record.date),
+                        record.duration,
+                        record.file_size,
+                        record.comment,
+                    ),
+                ).rowcount
+        return inserted
+
+    def sync_v2_statistic(
+        self,
+        client: BeelinePBX,
+        user_ids: Union[str, Iterable[str]],
+        date_from: datetime,
+        date_to: Optional[datetime] = None,
+        overlap: timedelta = timedelta(hours=1),
+        page_size: int = 100,
+    ) -> int:
+        """Store v2 statistic of ``user_ids`` newer than their high-water marks.
+
+        Return the number of new rows.
+        """
+        if isinstance(user_ids, str):
+            user_ids = [user_ids]
+        date_to = date_to or datetime.now()
+        inserted = 0
+        for user_id in user_ids:
+            since = self._sync_from(V2_STATISTIC, user_id, date_from, overlap)
+            inserted += self.add_v2_statistic(
+                client.iter_v2_statistic(
+                    user_id, since, date_to, page_size, compact=True
+                )
+            )
+            with self._lock, self.connection:
+                self._save_high_water_mark(V2_STATISTIC, user_id, date_to)
+        return inserted
+
+    def sync_call_records(
+        self,
+        client: BeelinePBX,
+        user_ids: Union[str, Iterable[str]],
+        date_from: datetime,
+        date_to: Optional[datetime] = None,
+        overlap: timedelta = timedelta(hours=1),
+    ) -> int:
+        """Store call records of ``user_ids`` newer than their high-water marks.
+
+        Return the number of new rows.
+        """
+        if isinstance(user_ids, str):
+            user_ids = [user_ids]
+        date_to = date_to or datetime.now()
+        inserted = 0
+        for user_id in user_ids:
+            since = self._sync_from(CALL_RECORDS, user_id, date_from, overlap)
+            params = {
+                'userId': user_id,
+                'dateFrom': format_datetime(since),
+                'dateTo': format_datetime(date_to),
+            }
+            inserted += self.add_call_records(client.iter_records(params, compact=True))
+            with self._lock, self.connection:
+                self._save_high_water_mark(CALL_RECORDS, user_id, date_to)
+        return inserted
+
+    def _query(
+        self,
+        table: str,
+        date_column: str,
+        user_id: Optional[str],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        **filters: Optional[str],
+    ) -> List[tuple]:
+        conditions, args = [], []
+        if user_id is not None:
+            filters['user_id'] = user_id
+        for column, value in filters.items():
+            if value is not None:
+                conditions.append(f't.{column} = ?')
+                args.append(value)
+        if date_from is not None:
+            conditions.append(f't.{date_column} >= ?')
+            args.append(to_milliseconds(date_from))
+        if date_to is not None:
+            conditions.append(f't.{date_column} < ?')
+            args.append(to_milliseconds(date_to))
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        with self._lock:
+            return self.connection.execute(
+                f'SELECT t.*, a.* FROM {table} t '
+                f'LEFT JOIN abonents a ON a.user_id = t.user_id '
+                f'{where} ORDER BY t.{date_column}',
+                args,
+            ).fetchall()
+
+    def query_v2_statistic(
+        self,
+        user_id: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        direction: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[StatRecordV2]:
+        rows = self._query(
+            V2_STATISTIC,
+            'start_date',
+            user_id,
+            date_from,
+            date_to,
+            direction=direction,
+            status=status,
+        )
+        return [
+            StatRecordV2(
+                parse_datetime_from_milliseconds(row[0]),
+                _abonent(row[1], row[9:]),
+                *row[2:9],
+            )
+            for row in rows
+        ]
+
+    def query_call_records(
+        self,
+        user_id: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        direction: Optional[str] = None,
+    ) -> List[CallRecord]:
+        rows = self._query(
+            CALL_RECORDS, 'date', user_id, date_from, date_to, direction=direction
+        )
+        return [
+            CallRecord(
+                *row[0:2],
+                *row[3:5],
+                parse_datetime_from_milliseconds(row[5]),
+                *row[6:8],
+                _abonent(row[2], row[9:]),
+                row[8],
+            )
+            for row in rows
+        ]
+
+
+def _abonent(user_id: str, columns: tuple) -> Abonent:
+    if columns[0] is None:
+        return Abonent(user_id, None)  # type: ignore
+    return Abonent(*columns)
@@ -0,0 +1,211 @@
+"""Keep many subscriptions alive.
+
+``SubscriptionManager`` creates every added subscription and re-creates it
+``renew_before`` seconds before it expires (the portal has no renewal call,
+so a new subscription replaces the old one, which is then stopped). Due
+renewals are kept in one heap ordered by time, a single thread sleeps until
+the earliest one. Failed calls are retried every ``retry_interval`` seconds,
+subscriptions that lapsed meanwhile (or are reported with ``lapsed``) are
+re-created the same way.
+"""
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .client import BeelinePBX
+from .errors import BeelinePBXException
+from .models import SubscriptionRequest
+
+
+PENDING = 'pending'
+ACTIVE = 'active'
+LAPSED = 'lapsed'
+
+
+@dataclass
+class ManagedSubscription:
+    request: SubscriptionRequest
+    subscription_id: Optional[str] = None
+    expires_at: Optional[float] = None
+    renewals: int = 0
+    failures: int = 0
+    last_error: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.request.pattern, self.request.subscription_type
+
+    def state(self, now: float) -> str:
+        if self.expires_at is None:
+            return LAPSED if self.failures else PENDING
+        return ACTIVE if now < self.expires_at else LAPSED
+
+
+class SubscriptionManager(object):
+    def __init__(
+        self,
+        client: BeelinePBX,
+        renew_before: float = 60,
+        retry_interval: float = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client = client
+        self.renew_before = renew_before
+        self.retry_interval = retry_interval
+        self.clock = clock
+        self.subscriptions: Dict[Tuple[str, str], ManagedSubscription] = {}
+        # (due, sequence, key); entries replaced by a later schedule are skipped
+        self._heap: List[Tuple[float, int, Tuple[str, str]]] = []
+        self._scheduled: Dict[Tuple[str, str], int] = {}
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._started = False
+
+    def _schedule(self, key: Tuple[str, str], due: float) -> None:
+        self._sequence += 1
+        self._scheduled[key] = self._sequence
+        heapq.heappush(self._heap, (due, self._sequence, key))
+        self._condition.notify()
+
+    def add(self, request: SubscriptionRequest) -> ManagedSubscription:
+        """Track ``request``, it is created by the next ``run_pending``."""
+        with self._condition:
+            subscription = ManagedSubscription(request)
+            existing = self.subscriptions.setdefault(subscription.key, subscription)
+            if existing is subscription:
+                self._schedule(subscription.key, self.clock())
+            return existing
+
+    def remove(self, pattern: str, subscription_type: str) -> None:
+        """Stop tracking the subscription and stop it on the portal."""
+        with self._condition:
+            subscription = self.subscriptions.pop((pattern, subscription_type), None)
+            self._scheduled.pop((pattern, subscription_type), None)
+        if subscription is not None and subscription.subscription_id:
+            self.client.stop_subscrption(subscription.subscription_id)
+
+    def lapsed(self, subscription_id: str) -> None:
+        """Re-create the subscription now, e.g. after the portal terminated it."""
+        with self._condition:
+            for key, subscription in self.subscriptions.items():
+                if subscription.subscription_id == subscription_id:
+                    subscription.subscription_id = None
+                    subscription.expires_at = self.clock()
+                    self._schedule(key, self.clock())
+
+    def _renew(self, subscription: ManagedSubscription) -> float:
+        """Create a replacement of ``subscription``, return when to renew it."""
+        now = self.clock()
+        previous_id = subscription.subscription_id
+        try:
+            result = self.client.create_subscription(subscription.request)
+            expires = int(result.get('expires') or subscription.request.expires)
+            subscription_id = result['subscriptionId']
+        except Exception as e:
+            # anything, including an unexpected response, is retried later
+            subscription.failures += 1
+            subscription.last_error = (
+                e.description if isinstance(e, BeelinePBXException) else repr(e)
+            )
+            return now + self.retry_interval
+        subscription.subscription_id = subscription_id
+        subscription.expires_at = now + expires
+        subscription.renewals += 1
+        subscription.last_error = None
+        if previous_id and previous_id != subscription.subscription_id:
+            try:
+                self.client.stop_subscrption(previous_id)
+            except Exception:
+                pass  # it expires on its own
+        # short-lived subscriptions are renewed half way through
+        return now + max(expires - self.renew_before, expires / 2)
+
+    def run_pending(self) -> int:
+        """Renew every subscription that is due, return how many were due."""
+        processed = 0
+        while True:
+            with self._condition:
+                if not self._heap or self._heap[0][0] > self.clock():
+                    return processed
+                _, sequence, key = heapq.heappop(self._heap)
+                subscription = self.subscriptions.get(key)
+                if subscription is None or self._scheduled.get(key) != sequence:
+                    continue
+            due = self._renew(subscription)
+            processed += 1
+            with self._condition:
+                removed = self.subscriptions.get(key) is not subscription
+                if not removed:
+                    self._schedule(key, due)
+            if removed and subscription.subscription_id:
+                try:
+                    self.client.stop_subscrption(subscription.subscription_id)
+                except Exception:
+                    pass
+
+    def next_due(self) -> Optional[float]:
+        with self._condition:
+            while self._heap and (
+                self._scheduled.get(self._heap[0][2]) != self._heap[0][1]
+            ):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def health(self) -> dict:
+        now = self.clock()
+        with self._condition:
+            states = {
+                key: subscription.state(now)
+                for key, subscription in self.subscriptions.items()
+            }
+        next_due = self.next_due()
+        running = self._thread is not None and self._thread.is_alive()
+        counts = {
+            state: sum(s == state for s in states.values())
+            for state in (PENDING, ACTIVE, LAPSED)
+        }
+        return {
+            # a started manager whose thread died renews nothing
+            'healthy': counts[LAPSED] == 0 and (running or not self._started),
+            'running': running,
+            'next_renewal_in': None if next_due is None else max(0, next_due - now),
+            **counts,
+            'subscriptions': states,
+        }
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                next_due = self.next_due()
+                timeout = None if next_due is None else next_due - self.clock()
+                if timeout is None or timeout > 0:
+                    self._condition.wait(timeout)
+                    continue
+            self.run_pending()
+
+    def start(self) -> None:
+        """Renew subscriptions in a background thread until ``stop``."""
+        self._stopping = False
+        self._started = True
+        self._thread = threading.Thread(
+            target=self._run, name='beeline-subscriptions', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, stop_subscriptions: bool = False) -> None:
+        with self._condition:
+            self._stopping = True
+            self._started = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if stop_subscriptions:
+            for pattern, subscription_type in list(self.subscriptions):
+                self.remove(pattern, subscription_type)
@@ -1,14 +1,28 @@
 import pytz
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dateutil.parser import parse
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterator, Optional
 
 
 DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
 DATE_FORMAT = '%Y-%m-%d'
+EPOCH = datetime(1970, 1, 1, tzinfo=pytz.utc)
 
+_utc_timestamps: ContextVar[bool] = ContextVar('beeline_utc_timestamps', default=False)
 
+
+@lru_cache(maxsize=4096)
 def parse_datetime(s: str) -> datetime:
-    return parse(s).replace(tzinfo=pytz.utc)
+    # the portal sends ISO dates and datetimes, fromisoformat handles them
+    # much faster than dateutil, which stays as a fallback for anything else
+    try:
+        dt = datetime.fromisoformat(s[:-1] if s.endswith('Z') else s)
+    except ValueError:
+        dt = parse(s)
+    return dt.replace(tzinfo=pytz.utc)
 
 
 def format_datetime(dt: datetime) -> str:
@@ -19,9 +33,47 @@ def format_date(d: datetime) -> str:
     return d.strftime(DATE_FORMAT)
 
 
-def parse_datetime_from_milliseconds(m: int) -> datetime:
+@contextmanager
+def utc_timestamps(enabled: bool = True) -> Iterator[None]:
+    """Decode millisecond timestamps as aware UTC datetimes in this block.
+
+    By default models get naive local datetimes, which needs a lookup in
+    the local timezone database for every decoded row. Lazy models decode
+    when a field is first accessed, so the access has to be in the block.
+    """
+    token = _utc_timestamps.set(enabled)
+    try:
+        yield
+    finally:
+        _utc_timestamps.reset(token)
+
+
+def parse_datetime_from_milliseconds(m: int, utc: Optional[bool] = None) -> datetime:
+    if utc is None:
+        utc = _utc_timestamps.get()
+    if utc:
+        return EPOCH + timedelta(milliseconds=m)
     return datetime.fromtimestamp(m / 1000)
 
 
 def to_milliseconds(dt: datetime) -> int:
     return int(dt.timestamp() * 1000)
+
+
+class Endpoint(str):
+    """Expanded endpoint path that remembers its template.
+
+    ``Endpoint('abonents/{pattern}/agent', pattern='201')`` is the string
+    ``'abonents/201/agent'`` with ``template`` ``'abonents/{pattern}/agent'``.
+    """
+
+    template: str
+
+    def __new__(cls, template: str, **params) -> 'Endpoint':
+        endpoint = super().__new__(cls, template.format(**params))
+        endpoint.template = template
+        return endpoint
+
+
+def endpoint_template(endpoint: str) -> str:
+    return getattr(endpoint, 'template', endpoint)
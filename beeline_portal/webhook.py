@@ -0,0 +1,152 @@
+"""Embeddable asyncio HTTP receiver of subscription events.
+
+The receiver is an ``aiohttp.web`` server, which parses HTTP and limits
+header count and size, body size (``max_body_size``) and idle keep-alive
+connections (``keepalive_timeout``); a body not received within
+``read_timeout`` seconds is answered with 408. Parsed events are put on a
+bounded queue; when it is full the receiver waits before answering, which
+slows the sender down instead of dropping events. ``workers`` tasks take
+events off the queue and call the handler: coroutine functions are awaited,
+plain functions run in the default thread pool executor.
+"""
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional
+
+try:
+    from aiohttp import web
+except ImportError:  # pragma: no cover
+    web = None  # type: ignore
+
+from .events import SubscriptionEvent, parse_event
+
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class EventReceiver(object):
+    def __init__(
+        self,
+        handler: Callable[[SubscriptionEvent], Any],
+        host: str = '127.0.0.1',
+        port: int = 0,
+        path: str = '/',
+        queue_size: int = 10000,
+        workers: int = 4,
+        on_error: Optional[Callable[[SubscriptionEvent, BaseException], Any]] = None,
+        max_body_size: int = MAX_BODY_SIZE,
+        read_timeout: float = 30,
+        keepalive_timeout: float = 15,
+    ):
+        if web is None:
+            raise ImportError(
+                'aiohttp is required for EventReceiver, '
+                'install it with `pip install beeline-portal[async]`'
+            )
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.path = path
+        self.queue_size = queue_size
+        self.workers = workers
+        self.on_error = on_error
+        self.max_body_size = max_body_size
+        self.read_timeout = read_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.received = 0
+        self.handled = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._runner: Optional['web.AppRunner'] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}{self.path}'
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(self.queue_size)
+        self._worker_tasks = [
+            asyncio.ensure_future(self._work()) for _ in range(self.workers)
+        ]
+        app = web.Application(client_max_size=self.max_body_size)
+        app.router.add_post(self.path, self._accept)
+        # no lingering, a timed out or too large body closes the connection
+        self._runner = web.AppRunner(
+            app,
+            access_log=None,
+            keepalive_timeout=self.keepalive_timeout,
+            lingering_time=0,
+        )
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        """Stop accepting events, handle the queued ones and stop workers."""
+        if self._runner is None:
+            return
+        await self._runner.cleanup()
+        await self._queue.join()  # type: ignore
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._runner = None
+
+    async def __aenter__(self) -> 'EventReceiver':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await self._queue.get()  # type: ignore
+            try:
+                if asyncio.iscoroutinefunction(self.handler):
+                    await self.handler(event)
+                else:
+                    await loop.run_in_executor(None, self.handler, event)
+                self.handled += 1
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                self.failed += 1
+                self._report_error(event, e)
+            finally:
+                self._queue.task_done()  # type: ignore
+
+    def _report_error(self, event: SubscriptionEvent, error: BaseException) -> None:
+        if self.on_error is None:
+            logger.error('Handler of event %s failed', event.event_id, exc_info=error)
+            return
+        try:
+            self.on_error(event, error)
+        except asyncio.CancelledError:
+            raise
+        except BaseException:
+            # a failing on_error must not stop the worker
+            logger.exception('on_error of event %s failed', event.event_id)
+
+    async def _accept(self, request: 'web.Request') -> 'web.Response':
+        try:
+            body = await asyncio.wait_for(request.read(), self.read_timeout)
+        except asyncio.TimeoutError:
+            return web.Response(status=408)
+        try:
+            event = parse_event(body)
+        except ValueError:
+            return web.Response(status=400)
+        self.received += 1
+        # waits while the queue is full, the sender gets no answer until then
+        await self._queue.put(event)  # type: ignore
+        return web.Response()
@@ -12,6 +12,7 @@ setup(
     version="0.0.5",
     packages=find_packages(exclude=("tests", "docs", "examples", "venv")),
     install_requires=["requests", "pytz"],
+    extras_require={"async": ["aiohttp"], "numpy": ["numpy"]},
     description="Beeline cloudpbx portal api wrapper",
     author="bzdvdn",
     author_email="bzdv.dn@gmail.com",
@@ -0,0 +1,61 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+
+Route = Callable[[BaseHTTPRequestHandler], Tuple[int, dict, bytes]]
+
+
+class StubPortal(object):
+    """Local stand-in for the portal api, serving canned responses.
+
+    ``routes`` maps ``(method, path)`` to a callable returning
+    ``(status, headers, body)``; every handled request is kept in ``requests``.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], Route] = {}
+        self.requests: list = []
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.body = self.rfile.read(length) if length else b''
+                portal.requests.append((self.command, self.path, self.body))
+                path = self.path.split('?', 1)[0]
+                route = portal.routes.get((self.command, path))
+                if route is None:
+                    status, headers, body = 404, {}, b'{"errorCode": 404}'
+                else:
+                    status, headers, body = route(self)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_PUT = do_POST = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    def json(self, method: str, path: str, payload, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.routes[(method, path)] = lambda _: (status, {}, body)
+
+    def __enter__(self) -> 'StubPortal':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
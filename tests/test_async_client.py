@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+
+from beeline_portal import AsyncBeelinePBX
+from beeline_portal.errors import BeelinePBXException
+from beeline_portal.models import Abonent
+from beeline_portal.recording import RecordingChange
+
+from .server import StubPortal
+
+
+class AsyncBeelinePBXTest(unittest.TestCase):
+    def _run(self, portal: StubPortal, coro_factory):
+        async def main():
+            async with AsyncBeelinePBX('token') as client:
+                client.API_URL = portal.url
+                return await coro_factory(client)
+
+        return asyncio.run(main())
+
+    def test_get_abonents(self):
+        with StubPortal() as portal:
+            portal.json('GET', '/abonents', [{'userId': '1', 'lastName': 'Moody'}])
+            abonents = self._run(portal, lambda c: c.get_abonents())
+        assert list(abonents) == [Abonent('1', 'Moody')]
+
+    def test_concurrent_requests(self):
+        with StubPortal() as portal:
+            portal.json('GET', '/abonents/1/agent', 'ONLINE')
+
+            async def fan_out(client):
+                return await asyncio.gather(
+                    *(client.get_abonent_agent_status('1') for _ in range(20))
+                )
+
+            statuses = self._run(portal, fan_out)
+        assert statuses == [{'status': 'ONLINE'}] * 20
+
+    def test_agent_statuses(self):
+        with StubPortal() as portal:
+            portal.json('GET', '/abonents/201/agent', 'ONLINE')
+            portal.json('PUT', '/abonents/201/agent', {})
+
+            async def bulk(client):
+                statuses = await client.get_agent_statuses(['201', '202'], 1)
+                updated = await client.set_agent_statuses({'201': 'OFFLINE'})
+                return statuses, updated
+
+            statuses, updated = self._run(portal, bulk)
+        assert statuses['201'] == {'status': 'ONLINE'}
+        assert statuses['202'].error_code == 404
+        assert updated == {'201': {}}
+
+    def test_fan_out_unexpected_error(self):
+        async def status(pattern):
+            if pattern == '202':
+                raise RuntimeError('boom')
+            await asyncio.sleep(0.01)
+            return {'status': 'ONLINE'}
+
+        async def main():
+            async with AsyncBeelinePBX('token') as client:
+                return await client._fan_out(
+                    status, {p: (p,) for p in ('201', '202', '203')}, 2
+                )
+
+        results = asyncio.run(main())
+        assert results['201'] == results['203'] == {'status': 'ONLINE'}
+        assert results['202'].error_code == 500
+
+    def test_abonents_recording(self):
+        with StubPortal() as portal:
+            portal.json('GET', '/abonents', [{'userId': '1', 'department': 'sales'}])
+            portal.json('GET', '/abonents/1/recording', 'OFF')
+            portal.json('PUT', '/abonents/1/recording', {})
+            report = self._run(
+                portal,
+                lambda c: c.enable_abonents_recording(['2'], department='sales'),
+            )
+        assert report['1'] == RecordingChange('1', 'OFF', 'changed')
+        assert report['2'].error_code == 404
+
+    def test_error_response(self):
+        with StubPortal() as portal:
+            portal.json(
+                'GET', '/abonents/1', {'errorCode': 404, 'description': 'x'}, 404
+            )
+            with self.assertRaises(BeelinePBXException) as ctx:
+                self._run(portal, lambda c: c.find_abonent('1'))
+        assert ctx.exception.error_code == 404
+
+    def test_iter_records(self):
+        from .test_records import record_struct
+
+        with StubPortal() as portal:
+            portal.json(
+                'GET', '/records', [record_struct('1', 1), record_struct('2', 1)]
+            )
+
+            async def collect(client):
+                return [r.id_ async for r in client.iter_records(chunk_size=16)]
+
+            ids = self._run(portal, collect)
+        assert ids == ['1', '2']
@@ -0,0 +1,120 @@
+import random
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from beeline_portal import batch as batch_module
+from beeline_portal.batch import StatRecordBatch
+from beeline_portal.models import StatRecordV2
+
+
+def row(start_date, user_id, direction, status, duration, phone_from=None):
+    return {
+        'startDate': start_date,
+        'abonent': {'userId': user_id, 'lastName': 'Moody'},
+        'direction': direction,
+        'status': status,
+        'duration': duration,
+        'phone_from': phone_from,
+    }
+
+
+ROWS = [
+    row(1638432499281, '1', 'INBOUND', 'PLACED', 10, '+7001'),
+    row(1638432500281, '1', 'OUTBOUND', 'PLACED', 20),
+    row(1638432501281, '2', 'INBOUND', 'MISSED', 0, '+7002'),
+    row(1638432502281, '2', 'INBOUND', 'PLACED', 30),
+]
+
+
+class StatRecordBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.batch = StatRecordBatch.from_beeline_struct(ROWS)
+
+    def test_columns(self):
+        assert len(self.batch) == 4
+        assert list(self.batch.duration) == [10, 20, 0, 30]
+        assert self.batch.column('user_id') == ['1', '1', '2', '2']
+        assert self.batch.dictionaries['direction'].values == ['INBOUND', 'OUTBOUND']
+        assert self.batch.column('phone_from') == ['+7001', None, '+7002', None]
+
+    def test_records(self):
+        assert self.batch.to_records() == [
+            StatRecordV2.from_beeline_struct(r) for r in ROWS
+        ]
+
+    def test_where(self):
+        assert list(self.batch.where(direction='INBOUND', status='PLACED')) == [0, 3]
+        assert list(self.batch.where(status='UNKNOWN')) == []
+        assert list(self.batch.where(min_duration=15)) == [1, 3]
+        date_from = datetime.fromtimestamp(1638432500.281)
+        assert list(self.batch.where(date_from=date_from, user_id='1')) == [1]
+
+    def test_filter(self):
+        missed = self.batch.filter(status='MISSED')
+        assert len(missed) == 1
+        assert missed.record(0).abonent.user_id == '2'
+
+    def test_group_sum(self):
+        assert self.batch.group_sum(('user_id',)) == {('1',): (2, 30), ('2',): (2, 30)}
+        assert self.batch.group_sum(('direction', 'status')) == {
+            ('INBOUND', 'PLACED'): (2, 40),
+            ('OUTBOUND', 'PLACED'): (1, 20),
+            ('INBOUND', 'MISSED'): (1, 0),
+        }
+
+    def test_extend_batch(self):
+        other = StatRecordBatch.from_beeline_struct(ROWS[:1])
+        other.extend_batch(self.batch)
+        assert len(other) == 5
+        assert other.column('status')[-1] == 'PLACED'
+
+
+@unittest.skipIf(batch_module._numpy() is None, 'numpy is not installed')
+class NumpyStatRecordBatchTest(unittest.TestCase):
+    """The NumPy and pure Python paths return the same results."""
+
+    def setUp(self):
+        rng = random.Random(1)
+        self.batch = StatRecordBatch.from_beeline_struct(
+            row(
+                1638432499281 + i * 1000,
+                str(rng.randrange(50)),
+                rng.choice(['INBOUND', 'OUTBOUND']),
+                rng.choice(['PLACED', 'MISSED']),
+                rng.randrange(600),
+            )
+            for i in range(500)
+        )
+
+    def both(self, method, *args, **kwargs):
+        result = getattr(self.batch, method)(*args, **kwargs)
+        with mock.patch.object(batch_module, 'numpy', None):
+            assert getattr(self.batch, method)(*args, **kwargs) == result
+        return result
+
+    def test_where(self):
+        selected = self.both(
+            'where',
+            direction='INBOUND',
+            status='PLACED',
+            date_from=datetime.fromtimestamp(1638432599.281),
+            min_duration=100,
+        )
+        assert selected.typecode == 'l' and 0 < len(selected) < 500
+        assert list(self.both('where', user_id='7')) == [
+            i for i, u in enumerate(self.batch.column('user_id')) if u == '7'
+        ]
+        assert len(self.both('where')) == 500
+
+    def test_group_sum(self):
+        by_user = self.both('group_sum', ('user_id', 'direction', 'status'))
+        assert sum(calls for calls, _ in by_user.values()) == 500
+        assert self.both('group_sum', ()) == {(): (500, sum(self.batch.duration))}
+        assert StatRecordBatch().group_sum() == {}
+
+    def test_sparse_group_sum(self):
+        # pretend the possible keys are too many for a dense bincount
+        dense = self.batch.group_sum(('user_id', 'direction'))
+        with mock.patch.object(batch_module.numpy, 'prod', return_value=float(1 << 40)):
+            assert self.batch.group_sum(('user_id', 'direction')) == dense
@@ -0,0 +1,140 @@
+import io
+import json
+import subprocess
+import sys
+import unittest
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+from beeline_portal import BeelinePBX
+from beeline_portal.errors import BeelinePBXException
+
+from .server import StubPortal
+
+
+def stat_struct(start_date: int, user_id: str = '1') -> dict:
+    return {
+        'startDate': start_date,
+        'abonent': {'userId': user_id, 'lastName': 'Moody'},
+        'direction': 'INBOUND',
+        'status': 'PLACED',
+        'duration': 10,
+    }
+
+
+def paged_statistic(rows: list):
+    def route(handler):
+        query = parse_qs(urlparse(handler.path).query)
+        page, page_size = int(query['page'][0]), int(query['pageSize'][0])
+        body = rows[page * page_size : (page + 1) * page_size]
+        return 200, {}, json.dumps(body).encode()
+
+    return route
+
+
+class ImportTest(unittest.TestCase):
+    def test_optional_dependencies_not_imported(self):
+        code = (
+            'import sys, beeline_portal; '
+            'assert "aiohttp" not in sys.modules and "numpy" not in sys.modules; '
+            'assert beeline_portal.AsyncBeelinePBX.__name__ == "AsyncBeelinePBX"'
+        )
+        subprocess.run([sys.executable, '-c', code], check=True)
+
+
+class BeelinePBXTest(unittest.TestCase):
+    def client(self, portal: StubPortal) -> BeelinePBX:
+        client = BeelinePBX('token')
+        client.API_URL = portal.url
+        return client
+
+    def test_iter_v2_statistic(self):
+        rows = [stat_struct(1638432499281 + i) for i in range(7)]
+        with StubPortal() as portal:
+            portal.routes[('GET', '/v2/statistics')] = paged_statistic(rows)
+            records = list(
+                self.client(portal).iter_v2_statistic(
+                    '1', datetime(2021, 1, 1), datetime(2021, 2, 1), page_size=3
+                )
+            )
+        assert [r.duration for r in records] == [10] * 7
+        assert len(portal.requests) == 3
+
+    def test_download_record_to(self):
+        audio = bytes(range(256)) * 1000
+        with StubPortal() as portal:
+            portal.routes[('GET', '/v2/records/1/download')] = lambda _: (
+                200,
+                {},
+                audio,
+            )
+            buffer = io.BytesIO()
+            written = self.client(portal).download_record_to(
+                '1', buffer, chunk_size=1024
+            )
+        assert written == len(audio)
+        assert buffer.getvalue() == audio
+
+    def test_download_record_to_error(self):
+        with StubPortal() as portal:
+            portal.json('GET', '/v2/records/1/download', {'errorCode': 404}, 404)
+            with self.assertRaises(BeelinePBXException) as ctx:
+                self.client(portal).download_record_to('1', io.BytesIO())
+        assert ctx.exception.error_code == 404
+
+    def test_iter_records(self):
+        from .test_records import record_struct
+
+        rows = [record_struct(str(i), 100) for i in range(50)]
+        with StubPortal() as portal:
+            portal.json('GET', '/records', rows)
+            records = list(self.client(portal).iter_records(chunk_size=64))
+        assert [r.id_ for r in records] == [str(i) for i in range(50)]
+
+    def test_iter_voice_campaign_info_numbers(self):
+        number = {
+            'phone': '+793799992',
+            'result': 'test',
+            'attempts': '1',
+            'lastAttemptDate': '2021-11-01',
+            'isDone': False,
+            'answer': 'done',
+            'answerCode': 'Q1',
+        }
+        with StubPortal() as portal:
+            portal.json(
+                'GET', '/vc/info/1', {'campaignName': 'c', 'numberList': [number] * 3}
+            )
+            numbers = list(
+                self.client(portal).iter_voice_campaign_info_numbers('1', 16)
+            )
+        assert [n.phone for n in numbers] == ['+793799992'] * 3
+
+    def test_agent_statuses(self):
+        with StubPortal() as portal:
+            for pattern in ('201', '202'):
+                portal.json('GET', f'/abonents/{pattern}/agent', 'ONLINE')
+                portal.json('PUT', f'/abonents/{pattern}/agent', {})
+            client = self.client(portal)
+            statuses = client.get_agent_statuses(['201', '202', '203'], max_workers=2)
+            updated = client.set_agent_statuses({'201': 'OFFLINE', '203': 'OFFLINE'})
+        assert statuses['201'] == statuses['202'] == {'status': 'ONLINE'}
+        assert isinstance(statuses['203'], BeelinePBXException)
+        assert list(updated) == ['201', '203']
+        assert updated['201'] == {}
+        assert updated['203'].error_code == 404
+        puts = [r for r in portal.requests if r[0] == 'PUT']
+        assert [json.loads(r[2]) for r in puts] == [{'status': 'OFFLINE'}] * 2
+
+    def test_fan_out_unexpected_error(self):
+        def status(pattern):
+            if pattern == '202':
+                raise RuntimeError('boom')
+            return {'status': 'ONLINE'}
+
+        results = BeelinePBX('token')._fan_out(
+            status, {p: (p,) for p in ('201', '202', '203')}, 2
+        )
+        assert results['201'] == results['203'] == {'status': 'ONLINE'}
+        assert results['202'].error_code == 500
+        assert isinstance(results['202'].__cause__, RuntimeError)
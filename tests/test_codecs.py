@@ -0,0 +1,35 @@
+import json
+import unittest
+
+from beeline_portal import BeelinePBX
+from beeline_portal.codecs import JsonCodec, OrjsonCodec, get_json_codec
+
+from .server import StubPortal
+
+
+class JsonCodecTest(unittest.TestCase):
+    def test_get_json_codec(self):
+        assert type(get_json_codec()) is JsonCodec
+        assert get_json_codec('json').loads(b'{"a": 1}') == {'a': 1}
+        assert get_json_codec('auto').loads(b'[1]') == [1]
+        with self.assertRaises(ValueError):
+            get_json_codec('yaml')
+
+    def test_invalid_input_raises_value_error(self):
+        for name in ('json', 'auto'):
+            with self.assertRaises(ValueError):
+                get_json_codec(name).loads(b'')
+
+    def test_client_codec(self):
+        try:
+            codec = OrjsonCodec()
+        except ImportError:
+            self.skipTest('orjson is not installed')
+        with StubPortal() as portal:
+            portal.json('PUT', '/abonents/1/agent', {})
+            portal.routes[('GET', '/abonents/1/recording')] = lambda _: (200, {}, b'')
+            client = BeelinePBX('token', json_codec=codec)
+            client.API_URL = portal.url
+            assert client.set_abonent_agent_status('1', 'ONLINE') == {}
+            assert client.get_abonent_recording_status('1') == {'status': ''}
+        assert json.loads(portal.requests[0][2]) == {'status': 'ONLINE'}
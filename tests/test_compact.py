@@ -0,0 +1,73 @@
+import sys
+import unittest
+
+from beeline_portal.compact import (
+    CompactAbonent,
+    CompactCallRecord,
+    CompactStatRecordV2,
+    CompactVoiceCampaignInfoNumber,
+)
+from beeline_portal.models import Abonent, StatRecordV2
+
+
+STAT_RECORD = {
+    'startDate': 1638432499281,
+    'abonent': {'userId': '9379992@beeline.ru', 'lastName': 'Moody', 'phone': '9379992'},
+    'direction': 'INBOUND',
+    'status': 'PLACED',
+    'duration': 2310,
+    'phone_from': '+79379999992',
+    'department': 'sales',
+}
+
+
+class CompactModelsTest(unittest.TestCase):
+    def test_stat_record_v2(self):
+        record = CompactStatRecordV2.from_beeline_struct(STAT_RECORD)
+        assert not hasattr(record, '__dict__')
+        assert isinstance(record.abonent, CompactAbonent)
+        assert not hasattr(record.abonent, '__dict__')
+        assert record.phone_to is None
+        assert record.to_beeline_struct() == StatRecordV2.from_beeline_struct(
+            STAT_RECORD
+        ).to_beeline_struct()
+        assert record == CompactStatRecordV2.from_beeline_struct(STAT_RECORD)
+        # the shared decoder keeps the eager nested model for the eager class
+        assert type(StatRecordV2.from_beeline_struct(STAT_RECORD).abonent) is Abonent
+
+    def test_smaller_than_dataclass(self):
+        compact = CompactStatRecordV2.from_beeline_struct(STAT_RECORD)
+        regular = StatRecordV2.from_beeline_struct(STAT_RECORD)
+        regular_size = sys.getsizeof(regular) + sys.getsizeof(regular.__dict__)
+        assert sys.getsizeof(compact) < regular_size
+
+    def test_call_record(self):
+        record = CompactCallRecord.from_beeline_struct(
+            {
+                'id': '1',
+                'externalId': '2',
+                'phone': '+79399999993',
+                'direction': 'INBOUND',
+                'date': 1638432499281,
+                'duration': 10,
+                'fileSize': 100,
+                'abonent': {'userId': '1', 'lastName': 'Moody'},
+            }
+        )
+        assert record.abonent == CompactAbonent('1', 'Moody')
+        assert repr(record).startswith('CompactCallRecord(')
+
+    def test_voice_campaign_info_number(self):
+        number = CompactVoiceCampaignInfoNumber.from_beeline_struct(
+            {
+                'phone': '+79379999992',
+                'result': 'SUCCESS',
+                'attempts': '1',
+                'lastAttemptDate': '2021-11-01',
+                'isDone': True,
+                'answer': 'yes',
+                'answerCode': 'B1',
+            }
+        )
+        assert not hasattr(number, '__dict__')
+        assert number.to_beeline_struct()['lastAttemptDate'] == '2021-11-01'
@@ -0,0 +1,60 @@
+import unittest
+
+from beeline_portal.directory import AbonentDirectory
+from beeline_portal.models import Abonent
+
+
+class FakeClient(object):
+    def __init__(self, abonents):
+        self.abonents = abonents
+        self.calls = []
+
+    def get_abonents(self):
+        self.calls.append('get_abonents')
+        return map(Abonent.from_beeline_struct, self.abonents)
+
+    def find_abonent(self, pattern):
+        self.calls.append(pattern)
+        return Abonent(pattern, 'Remote')
+
+
+class AbonentDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient(
+            [
+                {
+                    'userId': '1@beeline.ru',
+                    'lastName': 'Moody',
+                    'phone': '9379991',
+                    'extension': '201',
+                    'email': 'moody@example.com',
+                    'department': 'sales',
+                },
+                {'userId': '2@beeline.ru', 'lastName': 'Hank', 'department': 'sales'},
+            ]
+        )
+
+    def test_find_abonent_from_index(self):
+        directory = AbonentDirectory(self.client)
+        for pattern in ('1@beeline.ru', '9379991', '201', 'moody@example.com'):
+            assert directory.find_abonent(pattern).last_name == 'Moody'
+        assert self.client.calls == ['get_abonents']
+
+    def test_find_abonent_fallback(self):
+        directory = AbonentDirectory(self.client)
+        assert directory.find_abonent('999').last_name == 'Remote'
+        assert self.client.calls == ['get_abonents', '999']
+
+    def test_department(self):
+        directory = AbonentDirectory(self.client)
+        assert [a.last_name for a in directory.get_department('sales')] == [
+            'Moody',
+            'Hank',
+        ]
+        assert directory.get('extension', '201').user_id == '1@beeline.ru'
+
+    def test_ttl(self):
+        directory = AbonentDirectory(self.client, ttl=0)
+        directory.get_abonents()
+        directory.get_abonents()
+        assert self.client.calls == ['get_abonents', 'get_abonents']
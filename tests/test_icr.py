@@ -0,0 +1,59 @@
+import unittest
+
+from beeline_portal.icr import diff_icr_route_rules, sync_icr_route_rules
+from beeline_portal.models import IcrRouteRule, IcrRouteResult
+
+
+class FakeClient(object):
+    def __init__(self, rules):
+        self.rules = rules
+        self.batches = []
+
+    def get_icr_route_rules(self):
+        return iter(self.rules)
+
+    def _operation(self, name):
+        def apply(rules):
+            self.batches.append((name, [r.inbound_number for r in rules]))
+            return map(lambda r: IcrRouteResult(r, 'SUCCESS'), rules)
+
+        return apply
+
+    def __getattr__(self, name):
+        return self._operation(name.split('_')[0])
+
+
+class IcrRouteSyncTest(unittest.TestCase):
+    current = [
+        IcrRouteRule('+7001', '201'),
+        IcrRouteRule('+7002', '202'),
+        IcrRouteRule('+7003', '203'),
+    ]
+    desired = [
+        IcrRouteRule('+7001', '201'),
+        IcrRouteRule('+7002', '222'),
+        IcrRouteRule('+7004', '204'),
+        IcrRouteRule('+7005', '205'),
+    ]
+
+    def test_diff(self):
+        diff = diff_icr_route_rules(self.current, self.desired)
+        assert [r.inbound_number for r in diff.to_add] == ['+7004', '+7005']
+        assert diff.to_update == [IcrRouteRule('+7002', '222')]
+        assert diff.to_delete == [IcrRouteRule('+7003', '203')]
+        assert diff_icr_route_rules(self.current, self.current).is_empty
+
+    def test_keep_missing(self):
+        diff = diff_icr_route_rules(self.current, self.desired, delete_missing=False)
+        assert diff.to_delete == []
+
+    def test_sync(self):
+        client = FakeClient(self.current)
+        results = sync_icr_route_rules(client, self.desired, chunk_size=1)
+        assert client.batches == [
+            ('add', ['+7004']),
+            ('add', ['+7005']),
+            ('update', ['+7002']),
+            ('delete', ['+7003']),
+        ]
+        assert [r.status for r in results] == ['SUCCESS'] * 4
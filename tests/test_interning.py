@@ -0,0 +1,61 @@
+import json
+import unittest
+from datetime import datetime
+
+from beeline_portal import BeelinePBX
+from beeline_portal.compact import CompactStatRecordV2
+from beeline_portal.interning import current_decode_context, decode_context
+from beeline_portal.lazy import LazyStatRecordV2
+from beeline_portal.models import StatRecordV2
+
+from .server import StubPortal
+from .test_client import paged_statistic, stat_struct
+
+
+def decoded_rows(count: int) -> list:
+    # decode from JSON so equal strings are distinct objects, as in a response
+    rows = [stat_struct(1638432499281 + i, str(i % 2)) for i in range(count)]
+    return json.loads(json.dumps(rows))
+
+
+class DecodeContextTest(unittest.TestCase):
+    def test_shared_abonents_and_strings(self):
+        rows = decoded_rows(4)
+        with decode_context():
+            records = [StatRecordV2.from_beeline_struct(row) for row in rows]
+        assert records[0].abonent is records[2].abonent
+        assert records[0].abonent is not records[1].abonent
+        assert records[1].direction is records[3].direction
+        assert records[0].to_beeline_struct() == rows[0]
+        assert current_decode_context() is None
+
+    def test_no_context(self):
+        rows = decoded_rows(3)
+        records = [StatRecordV2.from_beeline_struct(row) for row in rows]
+        assert records[0].abonent == records[2].abonent
+        assert records[0].abonent is not records[2].abonent
+
+    def test_compact_and_lazy(self):
+        rows = decoded_rows(3)
+        with decode_context():
+            compact = [CompactStatRecordV2.from_beeline_struct(r) for r in rows]
+            lazy = [LazyStatRecordV2(r) for r in rows]
+            assert lazy[0].abonent is lazy[2].abonent
+        assert compact[0].abonent is compact[2].abonent
+        assert type(compact[0].abonent) is not type(lazy[0].abonent)
+
+    def test_prefetched_pages(self):
+        rows = decoded_rows(5)
+        with StubPortal() as portal:
+            portal.routes[('GET', '/v2/statistics')] = paged_statistic(rows)
+            client = BeelinePBX('token')
+            client.API_URL = portal.url
+            with decode_context() as context:
+                records = list(
+                    client.iter_v2_statistic(
+                        '1', datetime(2021, 1, 1), datetime(2021, 2, 1), page_size=2
+                    )
+                )
+        assert len(records) == 5
+        assert len({id(r.abonent) for r in records}) == 2
+        assert len(context.objects) == 2
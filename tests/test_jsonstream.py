@@ -0,0 +1,49 @@
+import json
+import unittest
+
+from beeline_portal.jsonstream import JsonArrayParser, iter_json_array
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    items = [
+        {'id': '1', 'comment': 'quote " and , ] } [ {', 'tags': [1, [2, 3]]},
+        {'id': '2', 'comment': 'escaped \\ backslash \\"', 'nested': {'a': None}},
+        'string item',
+        42,
+        None,
+        [],
+    ]
+
+    def test_top_level_array(self):
+        data = json.dumps(self.items).encode()
+        for size in (1, 2, 3, 7, 64, len(data)):
+            assert list(iter_json_array(chunked(data, size))) == self.items, size
+
+    def test_key(self):
+        document = {
+            'campaignName': 'numberList',
+            'other': {'numberList': [0]},
+            'numberList': self.items,
+            'total': 23,
+        }
+        data = json.dumps(document).encode()
+        for size in (1, 5, len(data)):
+            items = iter_json_array(chunked(data, size), key='numberList')
+            assert list(items) == self.items, size
+
+    def test_empty(self):
+        assert list(iter_json_array([b' [ ] '])) == []
+        assert list(iter_json_array([b'{"numberList": null}'], key='numberList')) == []
+
+    def test_bounded_buffer(self):
+        data = json.dumps([{'id': str(i)} for i in range(1000)]).encode()
+        parser = JsonArrayParser()
+        count = 0
+        for chunk in chunked(data, 100):
+            count += len(parser.feed(chunk))
+            assert len(parser._buf) < 200
+        assert count == 1000
@@ -0,0 +1,95 @@
+import unittest
+from dataclasses import fields
+
+from beeline_portal.interning import decode_context
+from beeline_portal.lazy import (
+    LazyCallRecord,
+    LazyStatRecordV2,
+    LazyVoiceCampaignInfoReport,
+)
+from beeline_portal.models import CallRecord, StatRecordV2, VoiceCampaignInfoReport
+
+
+STAT_RECORD = {
+    'startDate': 1638432499281,
+    'abonent': {'userId': '9379992@beeline.ru', 'lastName': 'Moody'},
+    'direction': 'INBOUND',
+    'status': 'PLACED',
+    'duration': 2310,
+    'phone_from': '+79379999992',
+}
+
+CALL_RECORD = {
+    'id': '1',
+    'externalId': '2',
+    'phone': '+79399999993',
+    'direction': 'INBOUND',
+    'date': 1638432499281,
+    'duration': 10,
+    'fileSize': 100,
+    'comment': '',
+    'abonent': {'userId': '1', 'lastName': 'Moody'},
+}
+
+REPORT = {
+    'campaignName': 'VoiceCampaign1',
+    'reportDate': '2021-11-01',
+    'client': 'bastion',
+    'state': 'PLANNED',
+    'startDate': '2021-11-01',
+    'finishDate': '2021-11-02',
+    'total': 23,
+    'processed': 10,
+    'success': 10,
+    'abandoned': 2,
+    'busyOrNoAnswer': 0,
+    'numberList': [
+        {
+            'phone': '+793799992',
+            'result': 'test',
+            'attempts': 'attempts',
+            'lastAttemptDate': '2021-11-01',
+            'isDone': False,
+            'answer': 'done',
+            'answerCode': 'Q1',
+        }
+    ],
+    'answerList': [{'answer': 'Test', 'answerCode': 'Q1', 'amount': 2}],
+}
+
+
+class LazyModelsTest(unittest.TestCase):
+    def test_decodes_on_access(self):
+        record = LazyStatRecordV2.from_beeline_struct(STAT_RECORD)
+        assert record.duration == 2310
+        assert 'start_date' not in record.__dict__
+        assert 'abonent' not in record.__dict__
+        assert record.abonent is record.abonent
+        assert record.abonent.user_id == '9379992@beeline.ru'
+
+    def test_same_as_eager(self):
+        for lazy, model, struct in (
+            (LazyStatRecordV2, StatRecordV2, STAT_RECORD),
+            (LazyCallRecord, CallRecord, CALL_RECORD),
+            (LazyVoiceCampaignInfoReport, VoiceCampaignInfoReport, REPORT),
+        ):
+            eager = model.from_beeline_struct(struct)
+            record = lazy(struct)
+            assert record.to_model() == eager
+            assert record.to_beeline_struct() == eager.to_beeline_struct()
+            for field in fields(model):
+                assert getattr(record, field.name) == getattr(eager, field.name)
+
+    def test_keeps_empty_optional_values(self):
+        struct = dict(STAT_RECORD, department='')
+        eager = StatRecordV2.from_beeline_struct(struct)
+        assert eager.department == ''
+        assert LazyStatRecordV2(struct).department == eager.department
+
+    def test_shares_report_abonent_like_eager(self):
+        struct = dict(REPORT, abonent=STAT_RECORD['abonent'])
+        with decode_context():
+            eager = VoiceCampaignInfoReport.from_beeline_struct(struct)
+            record = LazyVoiceCampaignInfoReport(struct)
+            assert record.abonent is not None
+            assert record.abonent is eager.abonent
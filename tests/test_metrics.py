@@ -0,0 +1,80 @@
+import unittest
+
+from beeline_portal import BeelinePBX
+from beeline_portal.metrics import InMemoryMetrics, LatencyHistogram, RequestObserver
+from beeline_portal.retry import RetryPolicy
+from beeline_portal.utils import Endpoint
+
+from .server import StubPortal
+
+
+class EndpointTest(unittest.TestCase):
+    def test_template(self):
+        endpoint = Endpoint('abonents/{pattern}/agent', pattern='201')
+        assert endpoint == 'abonents/201/agent'
+        assert endpoint.template == 'abonents/{pattern}/agent'
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+        assert histogram.count == 1000
+        for q in (50, 95, 99):
+            assert abs(histogram.percentile(q) - q / 100) <= q / 100 * 0.06, q
+        assert histogram.percentile(100) <= histogram.max == 1.0
+
+    def test_empty(self):
+        assert LatencyHistogram().percentile(99) == 0
+
+
+class RecordingObserver(RequestObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_request_start(self, http_method, endpoint):
+        self.events.append(('start', http_method, endpoint))
+
+    def on_request_end(self, info):
+        self.events.append(('end', info))
+
+
+class ClientMetricsTest(unittest.TestCase):
+    def test_observers(self):
+        metrics, observer = InMemoryMetrics(), RecordingObserver()
+        calls = []
+
+        def flaky(_):
+            calls.append(1)
+            return (503, {}, b'{}') if len(calls) == 1 else (200, {}, b'"ONLINE"')
+
+        with StubPortal() as portal:
+            portal.routes[('GET', '/abonents/201/agent')] = flaky
+            portal.json('PUT', '/abonents/201/agent', {})
+            client = BeelinePBX(
+                'token',
+                retry_policy=RetryPolicy(backoff_factor=0),
+                observers=[metrics, observer],
+            )
+            client.API_URL = portal.url
+            client.get_abonent_agent_status('201')
+            client.set_abonent_agent_status('201', 'ONLINE')
+            client.set_abonent_agent_status('201', 'OFFLINE')
+
+        assert observer.events[0] == ('start', 'get', 'abonents/{pattern}/agent')
+        info = observer.events[1][1]
+        assert (info.status_code, info.retries, info.bytes_received) == (200, 1, 8)
+        snapshot = metrics.snapshot()
+        assert set(snapshot) == {
+            'GET abonents/{pattern}/agent',
+            'PUT abonents/{pattern}/agent',
+        }
+        put = snapshot['PUT abonents/{pattern}/agent']
+        assert put['count'] == 2
+        assert put['errors'] == 0
+        assert put['bytes_sent'] == len(b'{"status": "ONLINE"}') + len(
+            b'{"status": "OFFLINE"}'
+        )
+        assert 0 < put['p50'] <= put['p99'] <= put['max']
+        assert snapshot['GET abonents/{pattern}/agent']['retries'] == 1
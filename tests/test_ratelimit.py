@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from beeline_portal import AsyncBeelinePBX, BeelinePBX
+from beeline_portal.ratelimit import RateLimiter, shared_rate_limiter
+
+from .server import StubPortal
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_rate(self):
+        limiter = RateLimiter(rate=50, burst=5)
+        started = time.monotonic()
+        for _ in range(15):
+            with limiter.limit():
+                pass
+        # 5 burst tokens, then 10 more at 50/s
+        assert time.monotonic() - started >= 0.18
+
+    def test_max_concurrency(self):
+        limiter = RateLimiter(rate=1000, max_concurrency=2)
+        in_flight, peak, lock = [0], [0], threading.Lock()
+
+        def call():
+            with limiter.limit():
+                with lock:
+                    in_flight[0] += 1
+                    peak[0] = max(peak[0], in_flight[0])
+                time.sleep(0.01)
+                with lock:
+                    in_flight[0] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak[0] == 2
+
+    def test_async_limit(self):
+        limiter = RateLimiter(rate=1000, max_concurrency=3)
+        in_flight, peak = [0], [0]
+
+        async def call():
+            async with limiter.async_limit():
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+                await asyncio.sleep(0.01)
+                in_flight[0] -= 1
+
+        async def main():
+            await asyncio.gather(*(call() for _ in range(10)))
+
+        asyncio.run(main())
+        asyncio.run(main())
+        assert peak[0] == 3
+
+    def test_shared_rate_limiter(self):
+        limiter = shared_rate_limiter('token', rate=10)
+        assert shared_rate_limiter('token', rate=10, burst=10) is limiter
+        assert shared_rate_limiter('other', rate=10) is not limiter
+        for kwargs in ({'rate': 20}, {'rate': 10, 'max_concurrency': 2}):
+            with self.assertRaises(ValueError):
+                shared_rate_limiter('token', **kwargs)
+
+    def test_streamed_response_holds_slot(self):
+        limiter = RateLimiter(rate=1000, max_concurrency=1)
+        with StubPortal() as portal:
+            portal.json('GET', '/abonents', [])
+            client = BeelinePBX('token', rate_limiter=limiter)
+            client.API_URL = portal.url
+            r = client._stream_api_request('abonents')
+            assert not limiter._semaphore.acquire(blocking=False)
+            r.close()
+            r.close()
+            assert limiter._semaphore.acquire(blocking=False)
+            limiter._semaphore.release()
+            client.get_abonents()
+            assert limiter._semaphore.acquire(blocking=False)
+
+    def test_async_response_holds_slot(self):
+        limiter = RateLimiter(rate=1000, max_concurrency=1)
+
+        async def main(url):
+            async with AsyncBeelinePBX('token', rate_limiter=limiter) as client:
+                client.API_URL = url
+                r = await client._request('get', 'abonents')
+                semaphore = limiter._async_semaphore()
+                held = semaphore.locked()
+                r.release()
+                await client.get_abonents()
+                return held, semaphore.locked()
+
+        with StubPortal() as portal:
+            portal.json('GET', '/abonents', [])
+            assert asyncio.run(main(portal.url)) == (True, False)
@@ -0,0 +1,56 @@
+import unittest
+
+from beeline_portal import BeelinePBX
+from beeline_portal.errors import BeelinePBXException
+from beeline_portal.recording import RecordingChange
+
+from .server import StubPortal
+
+
+class AbonentsRecordingTest(unittest.TestCase):
+    def portal(self) -> StubPortal:
+        portal = StubPortal()
+        portal.json(
+            'GET',
+            '/abonents',
+            [
+                {'userId': '1', 'department': 'sales'},
+                {'userId': '2', 'department': 'sales'},
+                {'userId': '3', 'department': 'support'},
+            ],
+        )
+        portal.json('GET', '/abonents/1/recording', 'ON')
+        portal.json('GET', '/abonents/2/recording', 'OFF')
+        portal.json('GET', '/abonents/3/recording', 'OFF')
+        for user_id in '123':
+            portal.json('PUT', f'/abonents/{user_id}/recording', {})
+            portal.json('DELETE', f'/abonents/{user_id}/recording', {})
+        return portal
+
+    def client(self, portal: StubPortal) -> BeelinePBX:
+        client = BeelinePBX('token')
+        client.API_URL = portal.url
+        return client
+
+    def test_enable_department(self):
+        with self.portal() as portal:
+            report = self.client(portal).enable_abonents_recording(department='sales')
+        assert report == {
+            '1': RecordingChange('1', 'ON', 'unchanged'),
+            '2': RecordingChange('2', 'OFF', 'changed'),
+        }
+        writes = [r[:2] for r in portal.requests if r[0] != 'GET']
+        assert writes == [('PUT', '/abonents/2/recording')]
+
+    def test_stop_patterns(self):
+        with self.portal() as portal:
+            report = self.client(portal).stop_abonents_recording(
+                ['1', '3', '4', '1'], max_workers=2
+            )
+        assert report['1'] == RecordingChange('1', 'ON', 'changed')
+        assert report['3'] == RecordingChange('3', 'OFF', 'unchanged')
+        assert isinstance(report['4'], BeelinePBXException)
+        assert report['4'].error_code == 404
+        assert list(report) == ['1', '3', '4']
+        writes = [r[:2] for r in portal.requests if r[0] != 'GET']
+        assert writes == [('DELETE', '/abonents/1/recording')]
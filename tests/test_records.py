@@ -0,0 +1,182 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlparse
+
+from beeline_portal import BeelinePBX
+from beeline_portal.errors import BeelinePBXException
+from beeline_portal.cursors import (
+    FileCursorStore,
+    MemoryCursorStore,
+    SQLiteCursorStore,
+)
+from beeline_portal.records import archive_records, sync_records
+from beeline_portal.utils import format_datetime, utc_timestamps
+
+from .server import StubPortal
+
+
+def record_struct(id_: str, file_size: int) -> dict:
+    return {
+        'id': id_,
+        'externalId': f'ext{id_}',
+        'phone': '+79399999993',
+        'direction': 'INBOUND',
+        'date': 1638432499281,
+        'duration': 10,
+        'fileSize': file_size,
+        'abonent': {'userId': '1', 'lastName': 'Moody'},
+    }
+
+
+class ArchiveRecordsTest(unittest.TestCase):
+    def test_archive_records(self):
+        audio = {'1': b'a' * 100, '2': b'b' * 200}
+        with StubPortal() as portal, tempfile.TemporaryDirectory() as target:
+            portal.json(
+                'GET',
+                '/records',
+                [record_struct(id_, len(body)) for id_, body in audio.items()],
+            )
+            for id_, body in audio.items():
+                portal.routes[('GET', f'/v2/records/{id_}/download')] = (
+                    lambda _, body=body: (200, {}, body)
+                )
+            client = BeelinePBX('token')
+            client.API_URL = portal.url
+
+            entries = archive_records(client, target, max_workers=2)
+            assert [e.status for e in entries] == ['downloaded', 'downloaded']
+            with open(os.path.join(target, '2.mp3'), 'rb') as f:
+                assert f.read() == audio['2']
+
+            entries = archive_records(client, target)
+            assert [e.status for e in entries] == ['skipped', 'skipped']
+            with open(os.path.join(target, 'manifest.json')) as f:
+                manifest = json.load(f)
+        assert {e['id_']: e['file_size'] for e in manifest} == {'1': 100, '2': 200}
+
+
+def ranged(body: bytes, honour_range: bool = True):
+    def route(handler):
+        range_header = handler.headers.get('Range')
+        if not range_header or not honour_range:
+            return 200, {}, body
+        start = int(range_header[len('bytes=') :].rstrip('-'))
+        headers = {'Content-Range': f'bytes {start}-{len(body) - 1}/{len(body)}'}
+        return 206, headers, body[start:]
+
+    return route
+
+
+class ResumeDownloadTest(unittest.TestCase):
+    audio = bytes(range(256)) * 40
+
+    def _download(self, honour_range: bool, on_disk: bytes, expected_size: int):
+        with StubPortal() as portal, tempfile.TemporaryDirectory() as target:
+            portal.routes[('GET', '/v2/records/1/download')] = ranged(
+                self.audio, honour_range
+            )
+            client = BeelinePBX('token')
+            client.API_URL = portal.url
+            path = os.path.join(target, '1.mp3')
+            with open(path, 'wb') as f:
+                f.write(on_disk)
+            written = client.download_record_to(
+                '1', path, resume=True, expected_size=expected_size
+            )
+            with open(path, 'rb') as f:
+                content = f.read()
+        return written, content, portal.requests
+
+    def test_resume(self):
+        written, content, requests = self._download(
+            True, self.audio[:1000], len(self.audio)
+        )
+        assert written == len(self.audio) - 1000
+        assert content == self.audio
+        assert len(requests) == 1
+
+    def test_range_ignored(self):
+        written, content, _ = self._download(False, self.audio[:1000], len(self.audio))
+        assert written == len(self.audio)
+        assert content == self.audio
+
+    def test_already_complete(self):
+        written, content, requests = self._download(True, self.audio, len(self.audio))
+        assert written == 0
+        assert requests == []
+
+    def test_size_mismatch(self):
+        with self.assertRaises(BeelinePBXException):
+            self._download(True, b'', len(self.audio) + 1)
+
+
+class SyncRecordsTest(unittest.TestCase):
+    def _sync(self, cursor_store, batches):
+        """Run one sync per batch of (id, date offset in minutes) records."""
+        results, date_from = [], []
+        with StubPortal() as portal:
+            client = BeelinePBX('token')
+            client.API_URL = portal.url
+            for batch in batches:
+                rows = []
+                for id_, minutes in batch:
+                    row = record_struct(id_, 1)
+                    row['date'] += minutes * 60000
+                    rows.append(row)
+                portal.json('GET', '/records', rows)
+                synced = sync_records(
+                    client,
+                    cursor_store,
+                    since=datetime(2021, 12, 1),
+                    params={'userId': '1'},
+                    overlap=timedelta(minutes=30),
+                )
+                results.append([r.id_ for r in synced])
+                query = parse_qs(urlparse(portal.requests[-1][1]).query)
+                assert query['userId'] == ['1']
+                date_from.append(query['dateFrom'][0])
+        return results, date_from
+
+    def test_watermark_and_dedupe(self):
+        store = MemoryCursorStore()
+        results, date_from = self._sync(
+            store,
+            [
+                [('2', 5), ('1', 0), ('1', 0)],
+                [('2', 5), ('3', 20), ('4', 60)],
+                [('4', 60), ('3', 20)],
+                [],
+            ],
+        )
+        assert results == [['1', '2'], ['3', '4'], [], []]
+        assert date_from[0] == format_datetime(datetime(2021, 12, 1))
+        cursor = store.load('records')
+        assert cursor['id'] == '4'
+        # ids older than the overlap window are forgotten
+        assert set(cursor['seen']) == {'4'}
+        assert date_from[2] == date_from[3] != date_from[1]
+
+    def test_cursor_stores(self):
+        with tempfile.TemporaryDirectory() as target:
+            stores = [
+                lambda: FileCursorStore(os.path.join(target, 'cursors.json')),
+                lambda: SQLiteCursorStore(os.path.join(target, 'cursors.sqlite3')),
+            ]
+            for make_store in stores:
+                results, _ = self._sync(make_store(), [[('1', 0)]])
+                results += self._sync(make_store(), [[('1', 0), ('2', 1)]])[0]
+                assert results == [['1'], ['2']]
+                assert make_store().load('records')['id'] == '2'
+                assert make_store().load('other') is None
+
+    def test_utc_timestamps(self):
+        store = MemoryCursorStore()
+        with utc_timestamps():
+            results, date_from = self._sync(store, [[('1', 0)], [('1', 0), ('2', 60)]])
+        assert results == [['1'], ['2']]
+        # resumed from the saved cursor, not from the naive ``since``
+        assert date_from[1] == '2021-12-02T07:38:19'
@@ -0,0 +1,87 @@
+import unittest
+
+from beeline_portal import BeelinePBX
+from beeline_portal.errors import BeelinePBXException
+from beeline_portal.models import SubscriptionRequest
+from beeline_portal.retry import RetryPolicy, parse_retry_after
+
+from .server import StubPortal
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_should_retry(self):
+        policy = RetryPolicy(max_attempts=3)
+        assert policy.should_retry(1, 'get')
+        assert policy.should_retry(2, 'put', 503)
+        assert not policy.should_retry(3, 'get', 503)
+        assert not policy.should_retry(1, 'get', 404)
+        assert not policy.should_retry(1, 'post', 503)
+        assert policy.should_retry(1, 'post', 429)
+        assert not policy.should_retry(1, 'put', 503, idempotent=False)
+        assert policy.should_retry(1, 'put', 429, idempotent=False)
+        assert policy.should_retry(1, 'post', 503, idempotent=True)
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        assert [policy.backoff(a) for a in (1, 2, 3, 4)] == [1, 2, 4, 5]
+        assert policy.backoff(1, '3') == 3
+        assert 0 <= RetryPolicy(backoff_factor=1).backoff(2) <= 2
+        # a longer Retry-After is not shortened, the request is given up
+        assert policy.backoff(1, '120') == 120
+        assert policy.retry_delay(1, 'get', 429, '120') is None
+        assert policy.retry_delay(1, 'get', 429, '4') == 4
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('2') == 2
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+        assert parse_retry_after(None) is None
+
+
+class ClientRetryTest(unittest.TestCase):
+    def _flaky(self, portal: StubPortal, failures: int, status: int = 503):
+        calls = []
+
+        def route(_):
+            calls.append(1)
+            if len(calls) <= failures:
+                return status, {'Retry-After': '0'}, b'{"errorCode": 503}'
+            return 200, {}, b'"ONLINE"'
+
+        portal.routes[('GET', '/abonents/1/agent')] = route
+        client = BeelinePBX('token', retry_policy=RetryPolicy(backoff_factor=0))
+        client.API_URL = portal.url
+        return client
+
+    def test_retry_then_success(self):
+        with StubPortal() as portal:
+            client = self._flaky(portal, 2)
+            assert client.get_abonent_agent_status('1') == {'status': 'ONLINE'}
+        assert len(portal.requests) == 3
+
+    def test_attempts_exhausted(self):
+        with StubPortal() as portal:
+            client = self._flaky(portal, 3)
+            with self.assertRaises(BeelinePBXException) as ctx:
+                client.get_abonent_agent_status('1')
+        assert ctx.exception.error_code == 503
+        assert len(portal.requests) == 3
+
+    def test_create_subscription_not_retried(self):
+        with StubPortal() as portal:
+            portal.json('PUT', '/subscription', {'errorCode': 503}, 503)
+            client = BeelinePBX('token', retry_policy=RetryPolicy(backoff_factor=0))
+            client.API_URL = portal.url
+            with self.assertRaises(BeelinePBXException):
+                client.create_subscription(
+                    SubscriptionRequest('1', 60, 'BASIC_CALL', 'http://x')
+                )
+        assert len(portal.requests) == 1
+
+    def test_connection_error(self):
+        client = BeelinePBX(
+            'token', retry_policy=RetryPolicy(backoff_factor=0), timeout=1
+        )
+        client.API_URL = 'http://127.0.0.1:9/'
+        with self.assertRaises(BeelinePBXException) as ctx:
+            client.get_abonents()
+        assert ctx.exception.error_code == 500
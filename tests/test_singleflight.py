@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from beeline_portal import AsyncBeelinePBX, BeelinePBX
+from beeline_portal.errors import BeelinePBXException
+from beeline_portal.retry import NO_RETRY
+from beeline_portal.singleflight import AsyncSingleFlight, SingleFlight
+
+from .server import StubPortal
+
+
+def slow_status(_):
+    time.sleep(0.2)
+    return 200, {}, b'"ONLINE"'
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_shared_result(self):
+        flight, calls, results = SingleFlight(), [], []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.1)
+            return object()
+
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do('key', fn)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert len(results) == 5 and all(r is results[0] for r in results)
+        # nothing is cached after the call completes
+        flight.do('key', fn)
+        assert len(calls) == 2
+
+    def test_shared_error(self):
+        flight, errors = SingleFlight(), []
+
+        def fn():
+            time.sleep(0.1)
+            raise ValueError('boom')
+
+        def call():
+            try:
+                flight.do('key', fn)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(errors) == 3
+
+    def test_async_shared_result(self):
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        async def main():
+            flight = AsyncSingleFlight()
+            results = await asyncio.gather(
+                *(flight.do('key', fn) for _ in range(5)), flight.do('other', fn)
+            )
+            return results
+
+        results = asyncio.run(main())
+        assert len(calls) == 2
+        assert results[:5] == [results[0]] * 5
+
+    def test_async_shared_error(self):
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError('boom')
+
+        async def main():
+            flight = AsyncSingleFlight()
+            return await asyncio.gather(
+                *(flight.do('key', fn) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_async_leader_cancelled(self):
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return 'result'
+
+        async def main():
+            flight = AsyncSingleFlight()
+            leader = asyncio.ensure_future(asyncio.wait_for(flight.do('key', fn), 0.01))
+            await asyncio.sleep(0)
+            waiters = [flight.do('key', fn) for _ in range(3)]
+            results = await asyncio.gather(leader, *waiters, return_exceptions=True)
+            return results, flight._calls
+
+        results, calls_in_flight = asyncio.run(main())
+        assert isinstance(results[0], asyncio.TimeoutError)
+        assert results[1:] == ['result'] * 3
+        assert len(calls) == 1 and not calls_in_flight
+
+
+class ClientCoalescingTest(unittest.TestCase):
+    def test_coalesce_gets(self):
+        with StubPortal() as portal:
+            portal.routes[('GET', '/abonents/201/agent')] = slow_status
+            client = BeelinePBX('token', coalesce_requests=True)
+            client.API_URL = portal.url
+            results = []
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(
+                        client.get_abonent_agent_status('201')
+                    )
+                )
+                for _ in range(5)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            requests = list(portal.requests)
+        assert results == [{'status': 'ONLINE'}] * 5
+        assert len(requests) == 1
+
+    def test_errors_shared(self):
+        with StubPortal() as portal:
+            portal.json('GET', '/abonents/201/agent', {'errorCode': 404}, status=404)
+            client = BeelinePBX('token', retry_policy=NO_RETRY, coalesce_requests=True)
+            client.API_URL = portal.url
+            with self.assertRaises(BeelinePBXException):
+                client.get_abonent_agent_status('201')
+
+    def test_async_coalesce_gets(self):
+        with StubPortal() as portal:
+            portal.routes[('GET', '/abonents/201/agent')] = slow_status
+
+            async def main():
+                async with AsyncBeelinePBX('token', coalesce_requests=True) as client:
+                    client.API_URL = portal.url
+                    return await asyncio.gather(
+                        *(client.get_abonent_agent_status('201') for _ in range(5)),
+                        client.get_abonent_agent_status('202'),
+                        return_exceptions=True,
+                    )
+
+            results = asyncio.run(main())
+            requests = list(portal.requests)
+        assert results[:5] == [{'status': 'ONLINE'}] * 5
+        assert isinstance(results[5], BeelinePBXException)
+        assert sorted(r[1] for r in requests) == [
+            '/abonents/201/agent',
+            '/abonents/202/agent',
+        ]
@@ -0,0 +1,46 @@
+import unittest
+from datetime import datetime, timedelta
+
+from beeline_portal import BeelinePBX
+from beeline_portal.statistics import fetch_v2_statistic, split_date_range
+
+from .server import StubPortal
+from .test_client import paged_statistic, stat_struct
+
+
+class SplitDateRangeTest(unittest.TestCase):
+    def test_window(self):
+        date_from = datetime(2021, 1, 1)
+        windows = split_date_range(
+            date_from, date_from + timedelta(hours=25), timedelta(days=1)
+        )
+        assert windows == [
+            (date_from, date_from + timedelta(days=1)),
+            (date_from + timedelta(days=1), date_from + timedelta(hours=25)),
+        ]
+
+    def test_shards(self):
+        date_from = datetime(2021, 1, 1)
+        windows = split_date_range(date_from, date_from + timedelta(days=4), shards=4)
+        assert len(windows) == 4
+        assert windows[-1][1] == date_from + timedelta(days=4)
+
+
+class FetchV2StatisticTest(unittest.TestCase):
+    def test_merge_and_dedupe(self):
+        # the stub ignores dates, so every window returns the same rows
+        rows = [stat_struct(1638432499281 - i * 1000) for i in range(5)]
+        with StubPortal() as portal:
+            portal.routes[('GET', '/v2/statistics')] = paged_statistic(rows)
+            client = BeelinePBX('token')
+            client.API_URL = portal.url
+            records = fetch_v2_statistic(
+                client,
+                '1',
+                datetime(2021, 1, 1),
+                datetime(2021, 1, 4),
+                max_workers=3,
+                page_size=2,
+            )
+        assert len(records) == 5
+        assert records == sorted(records, key=lambda r: r.start_date)
@@ -0,0 +1,79 @@
+import unittest
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+from beeline_portal import BeelinePBX
+from beeline_portal.store import CALL_RECORDS, V2_STATISTIC, StatisticStore
+from beeline_portal.utils import to_milliseconds, utc_timestamps
+
+from .server import StubPortal
+from .test_client import paged_statistic, stat_struct
+from .test_records import record_struct
+
+
+class StatisticStoreTest(unittest.TestCase):
+    def client(self, portal: StubPortal) -> BeelinePBX:
+        client = BeelinePBX('token')
+        client.API_URL = portal.url
+        return client
+
+    def test_sync_v2_statistic(self):
+        start = to_milliseconds(datetime(2021, 12, 2, 10))
+        rows = [stat_struct(start + i * 60000) for i in range(3)]
+        rows[1]['direction'] = 'OUTBOUND'
+        rows[2]['status'] = 'MISSED'
+        with StubPortal() as portal, StatisticStore() as store:
+            portal.routes[('GET', '/v2/statistics')] = paged_statistic(rows)
+            client = self.client(portal)
+            date_from, date_to = datetime(2021, 12, 1), datetime(2021, 12, 3)
+            assert store.sync_v2_statistic(client, '1', date_from, date_to) == 3
+            assert store.high_water_mark(V2_STATISTIC, '1') == date_to
+            # the stub returns the same rows again, they are not duplicated
+            assert (
+                store.sync_v2_statistic(client, '1', date_from, datetime(2021, 12, 4))
+                == 0
+            )
+            query = parse_qs(urlparse(portal.requests[-1][1]).query)
+            assert query['dateFrom'] == ['2021-12-02T23:00:00Z']
+
+            records = store.query_v2_statistic('1')
+            assert [r.to_beeline_struct() for r in records] == rows
+            assert store.query_v2_statistic(direction='OUTBOUND')[0].start_date == (
+                datetime(2021, 12, 2, 10, 1)
+            )
+            assert len(store.query_v2_statistic(status='PLACED')) == 2
+            assert store.query_v2_statistic(date_from=datetime(2021, 12, 2, 10, 2)) == (
+                records[2:]
+            )
+            assert store.query_v2_statistic(user_id='2') == []
+
+    def test_sync_call_records(self):
+        rows = [record_struct('1', 10), record_struct('2', 20)]
+        with StubPortal() as portal, StatisticStore() as store:
+            portal.json('GET', '/records', rows)
+            client = self.client(portal)
+            date_to = datetime(2021, 12, 3)
+            synced = store.sync_call_records(
+                client, ['1'], datetime(2021, 12, 1), date_to
+            )
+            assert synced == 2
+            assert store.high_water_mark(CALL_RECORDS, '1') == date_to
+            assert store.sync_call_records(client, '1', datetime(2021, 12, 1)) == 0
+            records = store.query_call_records(user_id='1')
+        assert [r.id_ for r in records] == ['1', '2']
+        assert records[0].abonent.last_name == 'Moody'
+        assert records[1].to_beeline_struct() == dict(rows[1], comment=None)
+
+    def test_sync_under_utc_timestamps(self):
+        start = to_milliseconds(datetime(2021, 12, 2, 10))
+        with StubPortal() as portal, StatisticStore() as store:
+            portal.routes[('GET', '/v2/statistics')] = paged_statistic(
+                [stat_struct(start)]
+            )
+            client = self.client(portal)
+            date_from = datetime(2021, 12, 1)
+            with utc_timestamps():
+                store.sync_v2_statistic(client, '1', date_from, datetime(2021, 12, 3))
+                store.sync_v2_statistic(client, '1', date_from, datetime(2021, 12, 4))
+            query = parse_qs(urlparse(portal.requests[-1][1]).query)
+        assert query['dateFrom'] == ['2021-12-02T23:00:00Z']
@@ -0,0 +1,159 @@
+import threading
+import time
+import unittest
+
+from beeline_portal.errors import BeelinePBXException
+from beeline_portal.models import SubscriptionRequest
+from beeline_portal.subscriptions import SubscriptionManager
+
+
+class FakeClient(object):
+    def __init__(self, expires=600):
+        self.expires = expires
+        self.created, self.stopped = [], []
+        self.fail = False
+        self.response = None
+
+    def create_subscription(self, request):
+        if self.fail:
+            raise BeelinePBXException({'errorCode': 500, 'description': 'down'})
+        if self.response is not None:
+            return self.response
+        self.created.append(request.pattern)
+        return {'subscriptionId': f'sub{len(self.created)}', 'expires': self.expires}
+
+    def stop_subscrption(self, subscription_id):
+        self.stopped.append(subscription_id)
+        return {}
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def request(pattern: str, expires: int = 600) -> SubscriptionRequest:
+    return SubscriptionRequest(
+        pattern, expires, 'BASIC_CALL', 'https://example.com/events'
+    )
+
+
+class SubscriptionManagerTest(unittest.TestCase):
+    def test_renewal_order(self):
+        client, clock = FakeClient(), Clock()
+        manager = SubscriptionManager(client, renew_before=60, clock=clock)
+        manager.add(request('201'))
+        assert manager.health()['pending'] == 1
+        assert manager.run_pending() == 1
+        clock.now += 100
+        client.expires = 300
+        manager.add(request('202'))
+        assert (
+            manager.add(request('202')) is manager.subscriptions[('202', 'BASIC_CALL')]
+        )
+        assert manager.run_pending() == 1
+        assert client.created == ['201', '202']
+        # 202 expires at 1400 and is due at 1340, 201 at 1600 -> 1540
+        assert manager.next_due() == 1340
+        clock.now = 1339
+        assert manager.run_pending() == 0
+        clock.now = 1600
+        assert manager.run_pending() == 2
+        assert client.created == ['201', '202', '202', '201']
+        assert client.stopped == ['sub2', 'sub1']
+        health = manager.health()
+        assert health['healthy'] and health['active'] == 2
+        assert manager.subscriptions[('201', 'BASIC_CALL')].renewals == 2
+
+    def test_failures_and_lapse(self):
+        client, clock = FakeClient(expires=100), Clock()
+        manager = SubscriptionManager(
+            client, renew_before=60, retry_interval=10, clock=clock
+        )
+        manager.add(request('201'))
+        manager.run_pending()
+        subscription = manager.subscriptions[('201', 'BASIC_CALL')]
+        # short-lived subscriptions are renewed half way through
+        assert manager.next_due() == 1050
+        client.fail = True
+        clock.now = 1050
+        manager.run_pending()
+        assert subscription.failures == 1 and subscription.last_error == 'down'
+        assert manager.next_due() == 1060
+        clock.now = 1200
+        manager.run_pending()
+        health = manager.health()
+        assert not health['healthy']
+        assert health['subscriptions'] == {('201', 'BASIC_CALL'): 'lapsed'}
+        client.fail = False
+        clock.now = 1210
+        manager.run_pending()
+        assert manager.health()['active'] == 1
+        assert subscription.subscription_id == 'sub2'
+
+        manager.lapsed('sub2')
+        assert manager.health()['lapsed'] == 1
+        assert manager.run_pending() == 1
+        assert subscription.subscription_id == 'sub3'
+        assert 'sub2' not in client.stopped
+        manager.remove('201', 'BASIC_CALL')
+        assert client.stopped == ['sub1', 'sub3']
+        assert manager.next_due() is None
+
+    def test_background_thread(self):
+        client = FakeClient(expires=1)
+        manager = SubscriptionManager(client, renew_before=0.9)
+        manager.start()
+        try:
+            manager.add(request('201'))
+            deadline = time.monotonic() + 2
+            while len(client.created) < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert manager.health()['running']
+        finally:
+            manager.stop(stop_subscriptions=True)
+        assert len(client.created) >= 3
+        assert not manager.health()['running']
+        assert client.stopped[-1] == f'sub{len(client.created)}'
+
+    def test_unexpected_response(self):
+        client, clock = FakeClient(), Clock()
+        manager = SubscriptionManager(client, retry_interval=10, clock=clock)
+        subscription = manager.add(request('201'))
+        for response in ('not a dict', {'expires': 600}):
+            client.response = response
+            manager.run_pending()
+            assert manager.next_due() == clock.now + 10
+            clock.now += 10
+        assert subscription.failures == 2
+        assert subscription.last_error == "KeyError('subscriptionId')"
+        assert manager.health()['lapsed'] == 1
+        client.response = None
+        manager.run_pending()
+        assert manager.health()['active'] == 1
+
+    def test_dead_thread_is_unhealthy(self):
+        manager = None
+
+        def clock():
+            if threading.current_thread() is manager._thread:
+                raise RuntimeError('clock failed')
+            return time.monotonic()
+
+        manager = SubscriptionManager(FakeClient(), clock=clock)
+        manager.add(request('201'))
+        manager.run_pending()
+        assert manager.health()['healthy']
+        excepthook, threading.excepthook = threading.excepthook, lambda args: None
+        try:
+            manager.start()
+            manager._thread.join(2)
+        finally:
+            threading.excepthook = excepthook
+        health = manager.health()
+        assert not health['running'] and not health['healthy']
+        manager.stop()
+        assert manager.health()['healthy']
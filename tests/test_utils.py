@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime
+
+import pytz
+from dateutil.parser import parse
+
+from beeline_portal.utils import (
+    parse_datetime,
+    parse_datetime_from_milliseconds,
+    to_milliseconds,
+    utc_timestamps,
+)
+from beeline_portal.compact import CompactStatRecordV2
+from beeline_portal.lazy import LazyStatRecordV2
+from beeline_portal.models import CallRecord, StatRecordV2
+
+
+class ParseDatetimeTest(unittest.TestCase):
+    def test_matches_dateutil(self):
+        for s in (
+            '2021-11-01',
+            '2021-11-01T10:20:30',
+            '2021-11-01T10:20:30Z',
+            '2021-11-01T10:20:30.123',
+            '2021-11-01T10:20:30+03:00',
+            '01.11.2021 10:20',
+        ):
+            assert parse_datetime(s) == parse(s).replace(tzinfo=pytz.utc), s
+
+    def test_cache(self):
+        assert parse_datetime('2021-11-02') is parse_datetime('2021-11-02')
+
+
+class ParseDatetimeFromMillisecondsTest(unittest.TestCase):
+    def test_utc(self):
+        dt = parse_datetime_from_milliseconds(1638432499281, utc=True)
+        assert dt == datetime(2021, 12, 2, 8, 8, 19, 281000, tzinfo=pytz.utc)
+        assert to_milliseconds(dt) == 1638432499281
+
+    def test_local(self):
+        dt = parse_datetime_from_milliseconds(1638432499281)
+        assert dt.tzinfo is None
+        assert to_milliseconds(dt) == 1638432499281
+
+    def test_utc_timestamps(self):
+        struct = {
+            'startDate': 1638432499281,
+            'abonent': {'userId': '1', 'lastName': 'Moody'},
+            'direction': 'INBOUND',
+            'status': 'PLACED',
+            'duration': 10,
+        }
+        expected = datetime(2021, 12, 2, 8, 8, 19, 281000, tzinfo=pytz.utc)
+        with utc_timestamps():
+            assert parse_datetime_from_milliseconds(1638432499281) == expected
+            assert parse_datetime_from_milliseconds(0, utc=False).tzinfo is None
+            for model in (StatRecordV2, CompactStatRecordV2, LazyStatRecordV2):
+                assert model.from_beeline_struct(struct).start_date.tzinfo is pytz.utc
+            record = dict(
+                struct, id='1', externalId='e', phone='+7', date=0, fileSize=1
+            )
+            assert CallRecord.from_beeline_struct(record).date == (
+                datetime(1970, 1, 1, tzinfo=pytz.utc)
+            )
+        assert StatRecordV2.from_beeline_struct(struct).start_date.tzinfo is None
@@ -0,0 +1,208 @@
+import asyncio
+import threading
+import unittest
+from datetime import datetime
+
+import aiohttp
+
+from beeline_portal.events import parse_event
+from beeline_portal.webhook import EventReceiver
+
+
+def event_xml(event_id: str, event_type: str = 'CallReceivedEvent') -> bytes:
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<xsi:Event xmlns:xsi="http://schema.broadsoft.com/xsi"
+    xmlns:xsi1="http://www.w3.org/2001/XMLSchema-instance"
+    xsi1:type="xsi:SubscriptionEvent">
+  <xsi:eventID>{event_id}</xsi:eventID>
+  <xsi:sequenceNumber>7</xsi:sequenceNumber>
+  <xsi:userId>201@mpbx.sip.beeline.ru</xsi:userId>
+  <xsi:externalApplicationId>app</xsi:externalApplicationId>
+  <xsi:subscriptionId>sub-1</xsi:subscriptionId>
+  <xsi:targetId>201@mpbx.sip.beeline.ru</xsi:targetId>
+  <xsi:eventData xsi1:type="xsi:{event_type}">
+    <xsi:call>
+      <xsi:callId>callhalf-1</xsi:callId>
+      <xsi:extTrackingId>42</xsi:extTrackingId>
+      <xsi:personality>Terminator</xsi:personality>
+      <xsi:state>Alerting</xsi:state>
+      <xsi:remoteParty>
+        <xsi:address countryCode="7">tel:+79999999999</xsi:address>
+        <xsi:callType>Network</xsi:callType>
+      </xsi:remoteParty>
+      <xsi:startTime>1638432499281</xsi:startTime>
+    </xsi:call>
+  </xsi:eventData>
+</xsi:Event>'''.encode()
+
+
+class ParseEventTest(unittest.TestCase):
+    def test_call_event(self):
+        event = parse_event(event_xml('e1'))
+        assert (event.event_id, event.sequence_number) == ('e1', 7)
+        assert event.event_type == 'CallReceivedEvent'
+        assert event.subscription_id == 'sub-1'
+        assert event.call.call_id == 'callhalf-1'
+        assert event.call.remote_address == 'tel:+79999999999'
+        assert event.call.remote_call_type == 'Network'
+        assert event.call.start_time == datetime.fromtimestamp(1638432499.281)
+        assert event.call.answer_time is None
+
+    def test_invalid(self):
+        for body in (b'not xml', b'<Event/>'):
+            with self.assertRaises(ValueError):
+                parse_event(body)
+
+
+class EventReceiverTest(unittest.TestCase):
+    def test_receive(self):
+        events, threads = [], set()
+
+        def handler(event):
+            threads.add(threading.get_ident())
+            events.append(event.event_id)
+
+        async def main():
+            async with EventReceiver(handler, path='/events') as receiver:
+                async with aiohttp.ClientSession() as session:
+                    statuses = []
+                    for i in range(20):
+                        async with session.post(
+                            receiver.url, data=event_xml(str(i))
+                        ) as r:
+                            statuses.append(r.status)
+                    for url, data in (
+                        (receiver.url, b'<broken'),
+                        (receiver.url.replace('/events', '/other'), event_xml('x')),
+                    ):
+                        async with session.post(url, data=data) as r:
+                            statuses.append(r.status)
+                    async with session.get(receiver.url) as r:
+                        statuses.append(r.status)
+            return statuses, receiver
+
+        statuses, receiver = asyncio.run(main())
+        assert statuses == [200] * 20 + [400, 404, 405]
+        # every accepted event is handled before close returns
+        assert sorted(events, key=int) == [str(i) for i in range(20)]
+        assert (receiver.received, receiver.handled, receiver.failed) == (20, 20, 0)
+        assert threading.get_ident() not in threads
+
+    def test_backpressure(self):
+        handled, errors = [], []
+
+        async def main():
+            gate = asyncio.Event()
+
+            async def handler(event):
+                await gate.wait()
+                if event.event_id == '0':
+                    raise RuntimeError('boom')
+                handled.append(event.event_id)
+
+            receiver = EventReceiver(
+                handler,
+                queue_size=2,
+                workers=1,
+                on_error=lambda event, e: errors.append((event.event_id, e)),
+            )
+            async with receiver:
+                async with aiohttp.ClientSession() as session:
+
+                    async def post(i):
+                        async with session.post(
+                            receiver.url, data=event_xml(str(i))
+                        ) as r:
+                            return r.status
+
+                    posts = [asyncio.ensure_future(post(i)) for i in range(5)]
+                    await asyncio.sleep(0.2)
+                    # one event in the handler and two queued, the rest wait
+                    blocked = sum(not p.done() for p in posts)
+                    queued = receiver.queued
+                    gate.set()
+                    statuses = await asyncio.gather(*posts)
+            return blocked, queued, statuses
+
+        blocked, queued, statuses = asyncio.run(main())
+        assert (blocked, queued) == (2, 2)
+        assert statuses == [200] * 5
+        assert sorted(handled) == ['1', '2', '3', '4']
+        assert [e[0] for e in errors] == ['0']
+
+    def test_failing_on_error(self):
+        handled = []
+
+        def handler(event):
+            if event.event_id != 'ok':
+                raise RuntimeError('boom')
+            handled.append(event.event_id)
+
+        def on_error(event, error):
+            raise ValueError('on_error failed')
+
+        async def main():
+            receiver = EventReceiver(
+                handler, queue_size=1, workers=2, on_error=on_error
+            )
+            async with receiver:
+                async with aiohttp.ClientSession() as session:
+                    for event_id in ['1', '2', '3', 'ok']:
+                        async with session.post(
+                            receiver.url, data=event_xml(event_id)
+                        ) as r:
+                            assert r.status == 200
+                # both workers survived the failures, so the queue drains
+                await asyncio.wait_for(receiver.close(), 5)
+            return receiver
+
+        with self.assertLogs('beeline_portal.webhook', 'ERROR'):
+            receiver = asyncio.run(main())
+        assert handled == ['ok']
+        assert (receiver.handled, receiver.failed) == (1, 3)
+
+    def test_http_limits(self):
+        body = event_xml('1')
+
+        async def exchange(receiver, data: bytes, wait: float = 0) -> bytes:
+            reader, writer = await asyncio.open_connection(receiver.host, receiver.port)
+            writer.write(data)
+            await asyncio.sleep(wait)
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response
+
+        async def main():
+            receiver = EventReceiver(
+                lambda event: None, read_timeout=0.2, keepalive_timeout=0.2
+            )
+            async with receiver:
+                head = f'POST / HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n'
+                continued = await exchange(
+                    receiver,
+                    f'{head}Expect: 100-continue\r\n\r\n'.encode() + body,
+                )
+                # the trailer of a chunked body does not break the next request
+                chunked = await exchange(
+                    receiver,
+                    b'POST / HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n'
+                    + f'{len(body):x}\r\n'.encode()
+                    + body
+                    + b'\r\n0\r\nX-Trailer: 1\r\n\r\n'
+                    + f'{head}Connection: close\r\n\r\n'.encode()
+                    + body,
+                )
+                headers = ''.join(f'X-{i}: 1\r\n' for i in range(200))
+                too_many = await exchange(receiver, f'{head}{headers}\r\n'.encode())
+                slow = await exchange(receiver, f'{head}\r\n'.encode() + body[:10])
+                # an idle keep-alive connection is closed by the receiver
+                idle = await exchange(receiver, b'', wait=0.5)
+            return continued, chunked, too_many, slow, idle, receiver
+
+        continued, chunked, too_many, slow, idle, receiver = asyncio.run(main())
+        assert continued.startswith(b'HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 200')
+        assert chunked.count(b'HTTP/1.1 200 OK') == 2
+        assert too_many.split(b' ', 2)[1] == b'400'
+        assert slow.startswith(b'HTTP/1.1 408')
+        assert idle == b''
+        assert receiver.received == 3